@@ -1,84 +1,203 @@
 import os
-from datetime import datetime, timedelta
+import io
+import csv
+import time
+import click
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlencode
+import hashlib
 import secrets
-from flask import Flask, request, jsonify
+import uuid
+from flask import Blueprint, Flask, current_app, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import NotFound
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
     create_refresh_token,
     jwt_required,
     get_jwt_identity,
+    decode_token,
 )
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from sqlalchemy import case, func, insert, select, text, tuple_, update
+from sqlalchemy.exc import DBAPIError, StatementError
 from .models import db, User, Task
-from .auth import create_user, authenticate_user, get_current_user
-from .email_utils import send_email
-from .models import PasswordResetToken
-from dotenv import load_dotenv
-
-app = Flask(__name__)
-
-# Configuration
-APP_ENV = os.environ.get('APP_ENV', 'development').lower()
-
-# Load .env only for non-production to aid local development
-if APP_ENV != 'production':
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        load_dotenv(dotenv_path=env_path)
-
-# Database configuration: require POSTGRES_URI in production, allow sqlite fallback in dev/test
-if APP_ENV == 'production':
-    postgres_uri = os.environ.get('POSTGRES_URI')
-    if not postgres_uri:
-        raise RuntimeError('POSTGRES_URI must be set in production')
-    app.config['SQLALCHEMY_DATABASE_URI'] = postgres_uri
-else:
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('POSTGRES_URI', 'sqlite:///tasks.db')
+from .auth import create_user, authenticate_user, get_current_user_info, invalidate_user
+from .email_utils import EMAIL_WORKER, EMAIL_POLL_INTERVAL, RESET_TOKEN_PLACEHOLDER, enqueue_email, deliver_pending, email_worker
+from .cache import LocalCache
+from .db_pool import engine_options_from_env
+from .json_provider import init_json_provider
+from .metrics import METRICS_TOKEN, init_metrics, render_metrics
+from . import profiling
+from .search import search_tasks
+from .task_cache import cache_tasks, get_cached_tasks, invalidate_tasks
+from .pagination import encode_cursor, decode_cursor
+from .reset_tokens import RESET_TOKEN_SWEEP_INTERVAL, find_reset_token, issue_reset_token, sweep_reset_tokens
+from .task_utils import PRIORITIES, parse_due_date, parse_new_task, parse_task_update, parse_imported_task, text_reader
+
+# Page size for GET /tasks
+DEFAULT_PAGE_SIZE = int(os.environ.get('TASKS_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.environ.get('TASKS_MAX_PAGE_SIZE', 500))
+MAX_BATCH_SIZE = int(os.environ.get('TASKS_MAX_BATCH_SIZE', 500))
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+# Development settings, read by create_app() outside production
+ENV_PATH = os.path.join(os.path.dirname(__file__), '.env')
 
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Routes are registered on this blueprint and the extensions bound to an app in create_app(),
+# so importing this module doesn't configure anything or touch the database
+api = Blueprint('api', __name__, cli_group=None)
+jwt = JWTManager()
 
-# Require JWT secret key. Fail fast if missing.
-jwt_secret = os.environ.get('JWT_SECRET_KEY')
-if not jwt_secret:
-    raise RuntimeError('JWT_SECRET_KEY must be set')
-app.config['JWT_SECRET_KEY'] = jwt_secret
+# Verified token -> identity, so the limiter doesn't decode every JWT a second time
+token_identities = LocalCache(maxsize=10000, ttl=300)
 
-# Shorter access token lifetime and enable refresh tokens
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=2)
-app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=7)
+def rate_limit_key():
+    """Key limits by user for authenticated requests so clients behind one address don't share a bucket.
 
-# Initialize extensions
-# Tighten CORS for production by restricting to configured frontend origin
-frontend_origin = os.environ.get('FRONTEND_ORIGIN')
-if APP_ENV == 'production' and frontend_origin:
-    CORS(app, resources={r"/*": {"origins": [frontend_origin]}})
-else:
-    CORS(app)
+    Any valid token would earn a fresh bucket, so the unauthenticated /auth routes pass
+    key_func=get_remote_address to their limits instead of using this.
+    """
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        token = auth_header[7:]
+        identity = token_identities.get(token)
+        if identity is None:
+            try:
+                claims = decode_token(token)
+            except Exception:
+                # Invalid or expired; the view decides whether that's allowed
+                claims = None
+            if claims:
+                identity = claims[current_app.config['JWT_IDENTITY_CLAIM']]
+                token_identities.set(token, identity, ttl=min(300, claims['exp'] - time.time()))
+        if identity:
+            return f"user:{identity}"
+    return get_remote_address()
+
+# Limits, strategy and storage come from the RATELIMIT_* config set in create_app()
+limiter = Limiter(rate_limit_key)
 
-db.init_app(app)
-jwt = JWTManager(app)
+@api.cli.command('deliver-emails')
+@click.option('--loop', is_flag=True, help='Keep polling the outbox instead of exiting after one pass')
+def deliver_emails_command(loop):
+    """Send queued emails from the outbox."""
+    while True:
+        sent, failed = deliver_pending()
+        click.echo(f"Sent {sent} email(s), {failed} failed")
+        if not loop:
+            break
+        if sent + failed == 0:
+            time.sleep(EMAIL_POLL_INTERVAL)
 
-# Rate limiting
-limiter = Limiter(get_remote_address, app=app, default_limits=["200 per day", "50 per hour"])
+@api.cli.command('profile-token')
+def profile_token_command():
+    """Print an X-Profile-Token header value that makes a request get profiled."""
+    if not profiling.PROFILE_SECRET:
+        raise click.ClickException("PROFILE_SECRET is not set")
+    click.echo(profiling.create_profile_token())
 
-# Create database tables
-with app.app_context():
-    db.create_all()
+@api.cli.command('sweep-reset-tokens')
+@click.option('--batch-size', type=int, default=None, help='Rows deleted per transaction')
+@click.option('--loop', is_flag=True, help='Keep sweeping every RESET_TOKEN_SWEEP_INTERVAL seconds')
+def sweep_reset_tokens_command(batch_size, loop):
+    """Delete used, expired and over-cap password reset tokens."""
+    while True:
+        reclaimed = sweep_reset_tokens(batch_size)
+        click.echo(f"Deleted {sum(reclaimed.values())} reset token(s): {reclaimed['expired']} expired, "
+                   f"{reclaimed['used']} used, {reclaimed['overCap']} over the per-user cap")
+        if not loop:
+            break
+        time.sleep(RESET_TOKEN_SWEEP_INTERVAL)
 
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def server_error(e):
     return jsonify({"error": "Something went wrong"}), 500
 
-# Liveness/health check endpoint for load balancers
-@app.route('/health', methods=['GET'])
+# Conditional GET helpers. Clients revalidate with If-None-Match and get a 304
+# without the rows being loaded or serialized.
+def make_etag(*parts):
+    raw = '|'.join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def not_modified_response(etag, last_modified=None):
+    """Return a 304 response if the request's If-None-Match matches etag, else None"""
+    if not request.if_none_match.contains(etag):
+        return None
+    response = current_app.response_class(status=304)
+    return add_validators(response, etag, last_modified)
+
+def add_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # Cache privately but revalidate every time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+# Liveness check: the process is up and serving requests
+@api.route('/health', methods=['GET'])
+@limiter.exempt
 def health():
     return jsonify({"status": "ok"}), 200
 
+# Readiness check for load balancers: a pooled database connection answers a trivial query.
+# It's public and unthrottled, so pool usage is only reported through /metrics.
+@api.route('/health/ready', methods=['GET'])
+@limiter.exempt
+def readiness():
+    try:
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        print(f"Readiness check failed: {e}")
+        return jsonify({"status": "unavailable", "database": "error"}), 503
+    return jsonify({"status": "ok", "database": "ok"}), 200
+
+# Prometheus scrape endpoint; samples from every gunicorn worker when PROMETHEUS_MULTIPROC_DIR is set
+@api.route('/metrics', methods=['GET'])
+@limiter.exempt
+def metrics():
+    if METRICS_TOKEN and not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {METRICS_TOKEN}'):
+        return jsonify({"error": "Unauthorized"}), 401
+    body, content_type = render_metrics()
+    return current_app.response_class(body, content_type=content_type)
+
+# Saved request profiles; authorized with the PROFILE_SECRET itself, not a profile token
+def profile_admin_error():
+    if not profiling.PROFILE_SECRET:
+        return jsonify({"error": "Profiling is not enabled"}), 404
+    if not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {profiling.PROFILE_SECRET}'):
+        return jsonify({"error": "Unauthorized"}), 401
+    return None
+
+@api.route('/admin/profiles', methods=['GET'])
+@limiter.exempt
+def list_request_profiles():
+    error = profile_admin_error()
+    if error:
+        return error
+    return jsonify({"profiles": profiling.list_profiles()}), 200
+
+@api.route('/admin/profiles/<name>', methods=['GET'])
+@limiter.exempt
+def download_request_profile(name):
+    error = profile_admin_error()
+    if error:
+        return error
+    if not profiling.PROFILE_NAME_PATTERN.match(name):
+        return jsonify({"error": "Profile not found"}), 404
+    try:
+        return send_from_directory(profiling.PROFILE_DIR, name, mimetype='text/plain', as_attachment=True)
+    except NotFound:
+        return jsonify({"error": "Profile not found"}), 404
+
 # Authentication endpoints
-@app.route('/auth/register', methods=['POST'])
+@api.route('/auth/register', methods=['POST'])
+@limiter.limit(lambda: current_app.config['RATELIMIT_DEFAULT'], key_func=get_remote_address)
 def register():
     try:
         data = request.get_json(force=True)
@@ -109,8 +228,8 @@ def register():
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
-@app.route('/auth/login', methods=['POST'])
-@limiter.limit("5 per minute")
+@api.route('/auth/login', methods=['POST'])
+@limiter.limit("5 per minute", key_func=get_remote_address)
 def login():
     try:
         data = request.get_json(force=True)
@@ -140,22 +259,28 @@ def login():
     else:
         return jsonify({"error": "Invalid username/email or password"}), 401
 
-@app.route('/auth/profile', methods=['GET'])
+@api.route('/auth/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
-    user = get_current_user()
+    user = get_current_user_info()
     if not user:
         return jsonify({"error": "User not found"}), 404
     
-    return jsonify({
+    etag = make_etag('profile', user.id, user.username, user.email, user.created_at)
+    not_modified = not_modified_response(etag)
+    if not_modified:
+        return not_modified
+
+    response = jsonify({
         "id": user.id,
         "username": user.username,
         "email": user.email,
-        "created_at": user.created_at.isoformat()
-    }), 200
+        "created_at": user.created_at
+    })
+    return add_validators(response, etag)
 
-@app.route('/auth/request-password-reset', methods=['POST'])
-@limiter.limit("3 per minute")
+@api.route('/auth/request-password-reset', methods=['POST'])
+@limiter.limit("3 per minute", key_func=get_remote_address)
 def request_password_reset():
     try:
         try:
@@ -170,28 +295,20 @@ def request_password_reset():
         user = User.query.filter_by(email=email).first()
         if user:
             try:
-                # Generate a secure token
-                token = secrets.token_urlsafe(48)
-                expires_at = datetime.utcnow() + timedelta(hours=1)
-                reset_token = PasswordResetToken(user_id=user.id, token=token, expires_at=expires_at)
-                db.session.add(reset_token)
-                db.session.commit()
+                # The token itself is minted when the email is sent; only its digest is stored
+                reset_token_id = issue_reset_token(user.id)
                 
                 # Build reset link using environment variable or default to production URL
                 frontend_url = os.environ.get('FRONTEND_URL', 'https://monstager.xyz')
-                reset_link = f"{frontend_url}/reset-password?token={token}"
+                reset_link = f"{frontend_url}/reset-password?token={RESET_TOKEN_PLACEHOLDER}"
                 subject = "Password Reset Request"
                 body = f"Hello {user.username},\n\nTo reset your password, click the link below (valid for 1 hour):\n{reset_link}\n\nIf you did not request this, you can ignore this email."
                 
-                # Try to send email, but don't fail if it doesn't work
-                try:
-                    send_email(user.email, subject, body)
-                except Exception as e:
-                    # Log the error but don't fail the request (security: don't reveal if email failed)
-                    print(f"Failed to send password reset email: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    # Continue anyway to avoid leaking information about email delivery status
+                # Queue the email in the same transaction as the token; the background
+                # sender delivers it (with retries) so a slow mail relay never holds this worker
+                enqueue_email(user.email, subject, body, reset_token_id=reset_token_id)
+                db.session.commit()
+                email_worker.wake()
             except Exception as db_error:
                 # Rollback database transaction on error
                 db.session.rollback()
@@ -212,8 +329,8 @@ def request_password_reset():
             pass
         return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
 
-@app.route('/auth/reset-password', methods=['POST'])
-@limiter.limit("3 per minute")
+@api.route('/auth/reset-password', methods=['POST'])
+@limiter.limit("3 per minute", key_func=get_remote_address)
 def reset_password():
     try:
         try:
@@ -232,7 +349,7 @@ def reset_password():
         if not validate_password(new_password):
             return jsonify({"error": "Password must be at least 12 characters long and include lowercase, uppercase, digit, and special character"}), 400
 
-        reset_token = PasswordResetToken.query.filter_by(token=token, used=False).first()
+        reset_token = find_reset_token(token)
         if not reset_token:
             return jsonify({"error": "Invalid or expired token"}), 400
         if reset_token.expires_at < datetime.utcnow():
@@ -247,6 +364,7 @@ def reset_password():
         user.password_hash = hash_password(new_password)
         reset_token.used = True
         db.session.commit()
+        invalidate_user(user.id)
         return jsonify({"message": "Password has been reset successfully."}), 200
     except Exception as e:
         import traceback
@@ -254,7 +372,7 @@ def reset_password():
         return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
 
 # Refresh token endpoint
-@app.route('/auth/refresh', methods=['POST'])
+@api.route('/auth/refresh', methods=['POST'])
 @jwt_required(refresh=True)
 def refresh_access_token():
     identity = get_jwt_identity()
@@ -262,104 +380,677 @@ def refresh_access_token():
     return jsonify({"access_token": access_token}), 200
 
 # Task endpoints (now require authentication)
-@app.route('/tasks', methods=['GET'])
+@api.route('/tasks', methods=['GET'])
 @jwt_required()
 def get_tasks():
-    user = get_current_user()
+    user = get_current_user_info()
     if not user:
         return jsonify({"error": "User not found"}), 404
-    
-    tasks = Task.query.filter_by(user_id=user.id).all()
-    return jsonify([task.to_dict() for task in tasks])
 
-@app.route('/tasks', methods=['POST'])
+    # Every task write bumps updated_at (deletes leave tombstones), so the newest
+    # updated_at identifies the user's task data; this is one probe of an index
+    last_modified = (
+        db.session.query(Task.updated_at)
+        .filter(Task.user_id == user.id)
+        .order_by(Task.updated_at.desc())
+        .limit(1)
+        .scalar()
+    )
+    # Parameter order doesn't change the response, so it doesn't change the ETag or cache key
+    shape = urlencode(sorted(request.args.items(multi=True)))
+    etag = make_etag('tasks', user.id, last_modified, shape)
+    not_modified = not_modified_response(etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    # Pages are cached per user and query. Writes through this worker drop them, and the
+    # ETag check catches writes through other workers sharing only the database.
+    generation, cached = get_cached_tasks(user.id, shape, etag)
+    if cached is not None:
+        response = current_app.response_class(cached["body"], mimetype='application/json')
+        if cached["nextCursor"]:
+            response.headers['X-Next-Cursor'] = cached["nextCursor"]
+        return add_validators(response, etag, last_modified)
+
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return jsonify({"error": f"Limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+    order = request.args.get('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        return jsonify({"error": "Order must be 'asc' or 'desc'"}), 400
+
+    query = Task.query.filter_by(user_id=user.id, deleted_at=None)
+
+    # Server-side filters
+    status = request.args.get('status')
+    if status:
+        query = query.filter(Task.status == status)
+
+    priority = request.args.get('priority')
+    if priority:
+        if priority not in PRIORITIES:
+            return jsonify({"error": "Invalid priority level"}), 400
+        query = query.filter(Task.priority == priority)
+
+    completed = request.args.get('completed')
+    if completed is not None:
+        if completed.lower() not in ('true', 'false'):
+            return jsonify({"error": "Completed must be 'true' or 'false'"}), 400
+        query = query.filter(Task.completed == (completed.lower() == 'true'))
+
+    for param, op in (('dueAfter', Task.due_date.__ge__), ('dueBefore', Task.due_date.__lt__)):
+        value = request.args.get(param)
+        if value:
+            try:
+                query = query.filter(op(parse_due_date(value)))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+    # Keyset pagination on (created_at, id) so only the requested page is read
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            created_at, task_id = decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        # A plain tuple on the right binds task_id with Task.id's type (16 bytes on SQLite)
+        if order == 'asc':
+            query = query.filter(tuple_(Task.created_at, Task.id) > (created_at, task_id))
+        else:
+            query = query.filter(tuple_(Task.created_at, Task.id) < (created_at, task_id))
+
+    if order == 'asc':
+        query = query.order_by(Task.created_at.asc(), Task.id.asc())
+    else:
+        query = query.order_by(Task.created_at.desc(), Task.id.desc())
+
+    # Fetch one extra row to find out whether another page exists. Plain rows go
+    # straight to the JSON encoder without building Task objects.
+    rows = query.with_entities(*Task.api_columns()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    response = jsonify([row._asdict() for row in rows])
+    next_cursor = encode_cursor(rows[-1].createdAt, rows[-1].id) if has_more else None
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    cache_tasks(user.id, generation, shape, {
+        "body": response.get_data(as_text=True),
+        "etag": etag,
+        "nextCursor": next_cursor,
+    })
+    return add_validators(response, etag, last_modified)
+
+EXPORT_COLUMNS = ['id', 'task', 'priority', 'completed', 'status', 'dueDate', 'createdAt', 'updatedAt']
+# Rows fetched per round-trip from the server-side cursor, and rows per chunk written to the client
+EXPORT_BATCH_SIZE = 1000
+
+@api.route('/tasks/export', methods=['GET'])
 @jwt_required()
-def add_task():
-    user = get_current_user()
+def export_tasks():
+    """Stream all of the user's tasks as NDJSON or CSV without holding them in memory."""
+    user = get_current_user_info()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    try:
-        data = request.get_json(force=True)
-    except Exception:
-        return jsonify({"error": "Invalid JSON"}), 400
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "Format must be 'ndjson' or 'csv'"}), 400
+
+    # yield_per streams from a server-side cursor instead of buffering the whole result
+    rows = (
+        Task.query.filter_by(user_id=user.id, deleted_at=None)
+        .order_by(Task.created_at.asc(), Task.id.asc())
+        .with_entities(*Task.api_columns())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    def generate_ndjson():
+        chunk = []
+        for row in rows:
+            record = row._asdict()
+            del record['userId']
+            chunk.append(current_app.json.dumps(record))
+            if len(chunk) >= EXPORT_BATCH_SIZE:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for count, row in enumerate(rows, start=1):
+            writer.writerow([
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in (getattr(row, column) for column in EXPORT_COLUMNS)
+            ])
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    if export_format == 'csv':
+        body, mimetype = generate_csv(), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(), 'application/x-ndjson'
+
+    response = current_app.response_class(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="tasks.{export_format}"'
+    return response
+
+# Rows validated and inserted per transaction by /tasks/import
+IMPORT_CHUNK_SIZE = 1000
+
+@api.route('/tasks/import', methods=['POST'])
+@jwt_required()
+def import_tasks():
+    """Import NDJSON or CSV tasks from the request body, streaming progress back as NDJSON.
+
+    Records are parsed as they arrive and validated like POST /tasks. Valid records are
+    inserted and committed one chunk at a time; each chunk reports the lines it rejected.
+    """
+    user = get_current_user_info()
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    import_format = request.args.get('format', 'ndjson').lower()
+    if import_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "Format must be 'ndjson' or 'csv'"}), 400
+
+    user_id = user.id
+
+    def read_records():
+        """Yield (line number, record, error) without reading the whole body"""
+        decoded = text_reader(request.stream)
+        if import_format == 'csv':
+            reader = csv.DictReader(decoded)
+            for record in reader:
+                # Empty cells mean "use the default", as if the key were missing
+                yield reader.line_num, {k: v for k, v in record.items() if k and v not in ('', None)}, None
+        else:
+            for line_number, line in enumerate(decoded, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, current_app.json.loads(line), None
+                except ValueError:
+                    yield line_number, None, "Invalid JSON"
+
+    def insert_chunk(rows):
+        if rows:
+            # updated_at is the flush time so /tasks/changes cursors and the list ETag taken
+            # while a long import runs still see chunks committed after them
+            flushed = datetime.utcnow()
+            db.session.execute(insert(Task), [{**row, "updated_at": flushed} for row in rows])
+            db.session.commit()
+            invalidate_tasks(user_id)
+        return len(rows)
+
+    def generate():
+        processed = inserted = failed = 0
+        chunk, errors = [], []
+        # created_at steps by a microsecond so imported tasks keep their file order
+        started = datetime.utcnow()
+        try:
+            for line_number, record, error in read_records():
+                if error is None:
+                    try:
+                        fields = parse_imported_task(record)
+                    except ValueError as e:
+                        error = str(e)
+                if error is None:
+                    timestamp = started + timedelta(microseconds=processed)
+                    chunk.append({**fields, "user_id": user_id, "created_at": timestamp})
+                else:
+                    errors.append({"line": line_number, "error": error})
+                processed += 1
+
+                if processed % IMPORT_CHUNK_SIZE == 0:
+                    inserted += insert_chunk(chunk)
+                    failed += len(errors)
+                    yield current_app.json.dumps({"processed": processed, "inserted": inserted, "errors": errors}) + '\n'
+                    chunk, errors = [], []
+        except (UnicodeDecodeError, csv.Error) as e:
+            errors.append({"line": None, "error": f"Unreadable input: {e}"})
+
+        inserted += insert_chunk(chunk)
+        failed += len(errors)
+        if chunk or errors or processed % IMPORT_CHUNK_SIZE:
+            yield current_app.json.dumps({"processed": processed, "inserted": inserted, "errors": errors}) + '\n'
+        yield current_app.json.dumps({"done": True, "processed": processed, "inserted": inserted, "failed": failed}) + '\n'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
 
-    task_text = data.get("task", "").strip()
-    priority = data.get("priority", "medium")
-    status = data.get("status", "To Do")
-    due_date_str = data.get("dueDate")
+# updated_at is stamped when a write is flushed, but the row only becomes visible at commit, so a
+# slow transaction can commit a change older than one already synced. Cursors never advance into
+# this many recent seconds; those changes are sent again by the next sync (clients apply by id).
+# Sorts before every task id, for cursors that point at a time rather than a task
+NIL_ID = str(uuid.UUID(int=0))
+CHANGES_SAFETY_WINDOW = timedelta(seconds=float(os.environ.get('TASKS_CHANGES_SAFETY_SECONDS', 5)))
+
+@api.route('/tasks/changes', methods=['GET'])
+@jwt_required()
+def get_task_changes():
+    """Return tasks created, modified or deleted after the `since` cursor.
+
+    Changes from the last CHANGES_SAFETY_WINDOW are included but the cursor stops before them.
+    """
+    user = get_current_user_info()
+    if not user:
+        return jsonify({"error": "User not found"}), 404
 
-    if priority not in ["low", "medium", "high"]:
-        return jsonify({"error": "Invalid priority level"}), 400
+    try:
+        limit = int(request.args.get('limit', MAX_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return jsonify({"error": f"Limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
 
-    if not task_text:
-        return jsonify({"error": "Task cannot be empty"}), 400
+    query = Task.query.filter_by(user_id=user.id)
 
-    # Parse due date if provided
-    due_date = None
-    if due_date_str:
+    since = request.args.get('since')
+    if since:
         try:
-            due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00'))
+            updated_at, task_id = decode_cursor(since)
         except ValueError:
-            return jsonify({"error": "Invalid date format"}), 400
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = query.filter(tuple_(Task.updated_at, Task.id) > (updated_at, task_id))
+    else:
+        # A full sync has nothing to delete locally
+        query = query.filter(Task.deleted_at.is_(None))
+
+    tasks = query.order_by(Task.updated_at.asc(), Task.id.asc()).limit(limit + 1).all()
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    horizon = datetime.utcnow() - CHANGES_SAFETY_WINDOW
+    settled = [task for task in tasks if task.updated_at <= horizon]
+    if settled:
+        cursor = encode_cursor(settled[-1].updated_at, settled[-1].id)
+    elif since:
+        cursor = since
+    else:
+        # A full sync with nothing settled still needs a cursor; start at the horizon
+        cursor = encode_cursor(horizon, NIL_ID)
+    if len(settled) < len(tasks):
+        # Everything after the cursor is recent; the client picks it up on its next sync
+        has_more = False
+
+    return jsonify({
+        "updated": [task.to_dict() for task in tasks if task.deleted_at is None],
+        "deleted": [task.id for task in tasks if task.deleted_at is not None],
+        "cursor": cursor,
+        "hasMore": has_more
+    }), 200
+
+# Longest due-date window /tasks/stats will build a histogram for
+MAX_STATS_DAYS = 366
+
+@api.route('/tasks/stats', methods=['GET'])
+@jwt_required()
+def get_task_stats():
+    """Aggregate counts for the board, calendar and progress views.
 
-    new_task = Task(task_text, priority, status, due_date, user.id)
+    Each dimension is one grouped query over the user's live tasks. The due-date
+    histogram covers `from`..`to` (inclusive YYYY-MM-DD, default the next 30 days).
+    """
+    user = get_current_user_info()
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else datetime.utcnow().date()
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else start + timedelta(days=29)
+    except ValueError:
+        return jsonify({"error": "Invalid date format"}), 400
+    if end < start or (end - start).days >= MAX_STATS_DAYS:
+        return jsonify({"error": f"Date window must span 1 to {MAX_STATS_DAYS} days"}), 400
+
+    live = (Task.user_id == user.id, Task.deleted_at.is_(None))
+    now = datetime.utcnow()
+
+    by_status = db.session.query(Task.status, func.count()).filter(*live).group_by(Task.status).all()
+    by_priority = db.session.query(Task.priority, func.count()).filter(*live).group_by(Task.priority).all()
+
+    total, completed, overdue = db.session.query(
+        func.count(),
+        func.coalesce(func.sum(case((Task.completed.is_(True), 1), else_=0)), 0),
+        func.coalesce(func.sum(case(((Task.completed.is_(False)) & (Task.due_date < now), 1), else_=0)), 0),
+    ).filter(*live).one()
+
+    due_day = func.date(Task.due_date)
+    by_day = (
+        db.session.query(due_day, func.count())
+        .filter(*live, Task.due_date >= datetime.combine(start, datetime.min.time()),
+                Task.due_date < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+        .group_by(due_day)
+        .all()
+    )
+
+    return jsonify({
+        "total": total,
+        "completed": completed,
+        "open": total - completed,
+        "overdue": overdue,
+        # Rows saved with a null status before it was validated have no name to count under
+        "byStatus": {status: count for status, count in by_status if status is not None},
+        "byPriority": {**{priority: 0 for priority in PRIORITIES}, **dict(by_priority)},
+        # SQLite returns date() as text, Postgres as a date
+        "dueByDay": {str(day): count for day, count in by_day},
+        "from": start.isoformat(),
+        "to": end.isoformat()
+    }), 200
+
+@api.route('/tasks/search', methods=['GET'])
+@jwt_required()
+def search_user_tasks():
+    """Full-text search over task text: every word must match (as a prefix), best matches first."""
+    user = get_current_user_info()
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return jsonify({"error": f"Limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+    try:
+        rows = search_tasks(user.id, request.args.get('q'), limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify([row._asdict() for row in rows]), 200
+
+@api.route('/tasks', methods=['POST'])
+@jwt_required()
+def add_task():
+    user = get_current_user_info()
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    try:
+        data = request.get_json(force=True)
+    except Exception:
+        return jsonify({"error": "Invalid JSON"}), 400
+
+    try:
+        fields = parse_new_task(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    new_task = Task(fields["task"], fields["priority"], fields["status"], fields["due_date"], user.id)
     
     db.session.add(new_task)
     db.session.commit()
+    invalidate_tasks(user.id)
     
     return jsonify(new_task.to_dict()), 201
 
-@app.route('/tasks/<task_id>', methods=['DELETE', 'PUT'])
+@api.route('/tasks/<task_id>', methods=['DELETE', 'PUT'])
 @jwt_required()
 def manage_task(task_id):
-    user = get_current_user()
+    user = get_current_user_info()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    task = Task.query.filter_by(id=task_id, user_id=user.id).first()
-    if not task:
-        return jsonify({"error": "Task not found"}), 404
+    live_task = (Task.id == task_id) & (Task.user_id == user.id) & Task.deleted_at.is_(None)
 
     if request.method == 'DELETE':
-        db.session.delete(task)
+        # Keep a tombstone so syncing clients see the delete through /tasks/changes.
+        # One UPDATE both checks ownership and deletes; updated_at is bumped by onupdate.
+        result = db.session.execute(
+            update(Task).where(live_task).values(deleted_at=datetime.utcnow()),
+            execution_options={'synchronize_session': False},
+        )
         db.session.commit()
+        invalidate_tasks(user.id)
+        if result.rowcount == 0:
+            return jsonify({"error": "Task not found"}), 404
         return jsonify({"message": "Task Deleted"}), 200
 
     elif request.method == 'PUT':
+        # Validate before touching the database
         try:
             data = request.get_json(force=True)
-            
-            if "task" in data:
-                task.task = data["task"].strip()
-            if "priority" in data:
-                task.priority = data["priority"]
-            if "completed" in data:
-                task.completed = data["completed"]
-            if "status" in data:
-                task.status = data["status"]
-            if "dueDate" in data:
-                due_date_str = data["dueDate"]
-                if due_date_str:
-                    try:
-                        task.due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00'))
-                    except ValueError:
-                        return jsonify({"error": "Invalid date format"}), 400
-                else:
-                    task.due_date = None
-
-            if task.priority not in ["low", "medium", "high"]:
-                return jsonify({"error": "Invalid priority level"}), 400
-            
-            if not task.task:
-                return jsonify({"error": "Task cannot be empty"}), 400
-            
-            db.session.commit()
-            return jsonify(task.to_dict()), 200
         except Exception:
             return jsonify({"error": "Invalid JSON"}), 400
 
+        try:
+            changes = parse_task_update(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        try:
+            if not changes:
+                # Nothing to write, so don't bump updated_at
+                row = db.session.execute(select(*Task.api_columns()).where(live_task)).first()
+            elif db.engine.dialect.update_returning:
+                row = db.session.execute(
+                    update(Task).where(live_task).values(**changes).returning(*Task.api_columns()),
+                    execution_options={'synchronize_session': False},
+                ).first()
+                db.session.commit()
+                invalidate_tasks(user.id)
+            else:
+                # SQLite before 3.35 has no RETURNING: load the row and update it through the ORM
+                task = Task.query.filter(live_task).first()
+                if not task:
+                    return jsonify({"error": "Task not found"}), 404
+                for column, value in changes.items():
+                    setattr(task, column, value)
+                db.session.commit()
+                invalidate_tasks(user.id)
+                return jsonify(task.to_dict()), 200
+        except StatementError as e:
+            db.session.rollback()
+            # A value a column type can't bind is the client's error; database failures aren't
+            if isinstance(e, DBAPIError) or not isinstance(e.orig, (TypeError, ValueError)):
+                raise
+            return jsonify({"error": "Invalid JSON"}), 400
+
+        if row is None:
+            return jsonify({"error": "Task not found"}), 404
+        return jsonify(row._asdict()), 200
+
+@api.route('/tasks/batch', methods=['POST'])
+@jwt_required()
+def batch_tasks():
+    """Apply a list of create/update/delete operations in a single transaction.
+
+    Body: {"operations": [{"op": "create", "data": {...}},
+                          {"op": "update", "id": "...", "data": {...}},
+                          {"op": "delete", "id": "..."}]}
+    Either every operation is applied or none is; the response lists a result per operation.
+    """
+    user = get_current_user_info()
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    try:
+        data = request.get_json(force=True)
+    except Exception:
+        return jsonify({"error": "Invalid JSON"}), 400
+
+    operations = data.get("operations") if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "Operations must be a non-empty list"}), 400
+    if len(operations) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"A batch can contain at most {MAX_BATCH_SIZE} operations"}), 400
+
+    # Validate everything up front with the same rules as the single-task handlers
+    parsed = []
+    results = [None] * len(operations)
+    for index, operation in enumerate(operations):
+        try:
+            if not isinstance(operation, dict):
+                raise ValueError("Invalid JSON")
+            op = operation.get("op")
+            if op == "create":
+                parsed.append((index, op, None, parse_new_task(operation.get("data"))))
+            elif op in ("update", "delete"):
+                task_id = operation.get("id")
+                if not isinstance(task_id, str) or not task_id:
+                    raise ValueError("Task id is required")
+                changes = parse_task_update(operation.get("data")) if op == "update" else None
+                parsed.append((index, op, task_id, changes))
+            else:
+                raise ValueError("Operation must be 'create', 'update' or 'delete'")
+        except ValueError as e:
+            results[index] = {"index": index, "status": 400, "error": str(e)}
+
+    # Load every task the batch touches with one query
+    task_ids = {task_id for _, _, task_id, _ in parsed if task_id}
+    tasks = {}
+    if task_ids:
+        tasks = {
+            task.id: task
+            for task in Task.query.filter(
+                Task.user_id == user.id, Task.deleted_at.is_(None), Task.id.in_(task_ids)
+            )
+        }
+
+    now = datetime.utcnow()
+    created = []
+    for index, op, task_id, fields in parsed:
+        if op == "create":
+            new_task = Task(fields["task"], fields["priority"], fields["status"], fields["due_date"], user.id)
+            created.append((index, new_task))
+            continue
+
+        task = tasks.get(task_id)
+        if task is None:
+            results[index] = {"index": index, "status": 404, "error": "Task not found"}
+        elif op == "update":
+            for column, value in fields.items():
+                setattr(task, column, value)
+            results[index] = {"index": index, "status": 200, "task": task}
+        else:
+            task.deleted_at = now
+            # Later operations in the same batch must not see the deleted task
+            del tasks[task_id]
+            results[index] = {"index": index, "status": 200, "id": task_id}
+
+    if any(result["status"] >= 400 for result in results if result):
+        db.session.rollback()
+        return jsonify({
+            "error": "Batch rejected; no operations were applied",
+            "results": [
+                result if result and result["status"] >= 400 else {"index": index, "status": 409, "error": "Not applied"}
+                for index, result in enumerate(results)
+            ]
+        }), 400
+
+    # One flush batches the INSERTs and UPDATEs into executemany calls
+    db.session.add_all([task for _, task in created])
+    db.session.flush()
+    for index, task in created:
+        results[index] = {"index": index, "status": 201, "task": task}
+    for result in results:
+        if "task" in result:
+            result["task"] = result["task"].to_dict()
+    db.session.commit()
+    invalidate_tasks(user.id)
+
+    return jsonify({"results": results}), 200
+
+def init_migrations(app):
+    """Register Flask-Migrate and the `flask db` commands. This imports Alembic, which
+    takes longer than the rest of the app, so create_app() only calls it for the CLI."""
+    from flask_migrate import Migrate
+    Migrate(app, db, directory=MIGRATIONS_DIR, render_as_batch=True)
+
+def create_app(config=None):
+    """Build the app from environment variables, with `config` overriding any setting.
+
+    Doesn't create tables: schema is managed by versioned migrations in backend/migrations
+    (flask db upgrade), and tests call db.create_all() themselves.
+    """
+    app = Flask(__name__)
+    # orjson when installed, stdlib otherwise (JSON_PROVIDER=orjson|stdlib|auto)
+    init_json_provider(app, os.environ.get('JSON_PROVIDER', 'auto').lower())
+
+    # Configuration
+    app_env = os.environ.get('APP_ENV', 'development').lower()
+
+    # Load .env only for non-production to aid local development
+    if app_env != 'production':
+        if os.path.exists(ENV_PATH):
+            # Only imported when there is a file to read
+            from dotenv import load_dotenv
+            load_dotenv(dotenv_path=ENV_PATH)
+
+    # Database configuration: require POSTGRES_URI in production, allow sqlite fallback in dev/test
+    if app_env == 'production':
+        app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('POSTGRES_URI')
+    else:
+        app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('POSTGRES_URI', 'sqlite:///tasks.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY')
+    # Shorter access token lifetime and enable refresh tokens
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=2)
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=7)
+
+    # Rate limiting (RATELIMIT_ENABLED=false turns it off, e.g. for load tests).
+    # Counters live in RATELIMIT_STORAGE_URI; use redis:// or memcached:// so that every
+    # gunicorn worker and instance shares them instead of each keeping its own.
+    app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', 'true').lower() != 'false'
+    app.config['RATELIMIT_STORAGE_URI'] = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
+    # fixed-window (cheapest), moving-window (exact) or sliding-window-counter
+    app.config['RATELIMIT_STRATEGY'] = os.environ.get('RATELIMIT_STRATEGY', 'fixed-window')
+    app.config['RATELIMIT_DEFAULT'] = os.environ.get('RATELIMIT_DEFAULT', '200 per day;50 per hour')
+
+    app.config.update(config or {})
+
+    if not app.config['SQLALCHEMY_DATABASE_URI']:
+        raise RuntimeError('POSTGRES_URI must be set in production')
+    # Require JWT secret key. Fail fast if missing.
+    if not app.config['JWT_SECRET_KEY']:
+        raise RuntimeError('JWT_SECRET_KEY must be set')
+    # Pool size, overflow, pre-ping, recycle and statement timeout from DB_* variables
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options_from_env(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    # Initialize extensions
+    # Tighten CORS for production by restricting to configured frontend origin
+    frontend_origin = os.environ.get('FRONTEND_ORIGIN')
+    if app_env == 'production' and frontend_origin:
+        CORS(app, resources={r"/*": {"origins": [frontend_origin]}}, expose_headers=["X-Next-Cursor", "ETag"])
+    else:
+        CORS(app, expose_headers=["X-Next-Cursor", "ETag"])
+
+    db.init_app(app)
+    jwt.init_app(app)
+    limiter.init_app(app)
+    # Per-route latency, status and SQL counters for GET /metrics (METRICS_ENABLED=false to skip)
+    init_metrics(app)
+    # Opt-in cProfile capture of slow requests (PROFILE_SAMPLE_RATE / PROFILE_SECRET); no hooks when off
+    profiling.init_profiling(app)
+    app.register_blueprint(api)
+
+    # Loaded by the `flask` command (flask --app backend.app db upgrade), not by gunicorn or tests
+    if click.get_current_context(silent=True) is not None:
+        init_migrations(app)
+
+    # Behind nginx every request comes from the proxy; trust this many X-Forwarded-For hops
+    proxy_count = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    if proxy_count:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count)
+
+    # Deliver queued email from this process unless a separate `flask deliver-emails` runs
+    if EMAIL_WORKER == 'thread':
+        email_worker.start(app)
+
+    return app
+
 # Only runs if this file is executed directly
 if __name__ == '__main__':
     print(f"Starting Flask app on host=0.0.0.0, port=5000")
-    app.run(host='0.0.0.0', port=5000)
+    create_app().run(host='0.0.0.0', port=5000)
@@ -1,15 +1,89 @@
+import os
 import bcrypt
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
+from sqlalchemy import event
+from .cache import create_cache
+from .metrics import CACHE_LOOKUPS, PASSWORD_HASH_TIME
 from .models import User, db
 import re
 
+# bcrypt cost factor; every +1 doubles the time per hash
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+# Where bcrypt runs: 'thread' (bcrypt releases the GIL), 'process', or 'inline'
+HASH_EXECUTOR = os.environ.get('HASH_EXECUTOR', 'thread').lower()
+# Upper bound on concurrent hashes per worker so a login burst cannot take every core
+HASH_WORKERS = int(os.environ.get('HASH_WORKERS', 2))
+# Scheduling niceness for 'process' hashing workers so request handling wins the CPU
+HASH_NICE = int(os.environ.get('HASH_NICE', 10))
+
+_executor = None
+
+def _get_executor():
+    """Create the hashing executor lazily so each gunicorn worker gets its own after fork"""
+    global _executor
+    if _executor is None and HASH_EXECUTOR != 'inline':
+        if HASH_EXECUTOR == 'process':
+            _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS, initializer=_lower_priority, initargs=(HASH_NICE,))
+        elif HASH_EXECUTOR == 'thread' and _threads_are_greenlets():
+            # Under gevent, patched threads are greenlets and bcrypt would stall the event
+            # loop; gevent's executor runs the hash on a real OS thread
+            from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+            _executor = NativeThreadPoolExecutor(max_workers=HASH_WORKERS)
+        elif HASH_EXECUTOR == 'thread':
+            _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='bcrypt')
+        else:
+            raise RuntimeError(f"Unknown HASH_EXECUTOR '{HASH_EXECUTOR}'")
+    return _executor
+
+def _threads_are_greenlets():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+def _lower_priority(niceness):
+    if niceness and hasattr(os, 'nice'):
+        os.nice(niceness)
+
+def shutdown_hash_executor():
+    """Shut down the hashing executor; the next hash creates a new one from the current settings"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+def _run_hashing(fn, *args):
+    executor = _get_executor()
+    if executor is None:
+        return fn(*args)
+    return executor.submit(fn, *args).result()
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _checkpw(password, hashed_password):
+    return bcrypt.checkpw(password, hashed_password)
+
 def hash_password(password):
     """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    with PASSWORD_HASH_TIME.labels('hash').time():
+        return _run_hashing(_hashpw, password.encode('utf-8'), BCRYPT_ROUNDS).decode('utf-8')
 
 def verify_password(password, hashed_password):
     """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    with PASSWORD_HASH_TIME.labels('verify').time():
+        return _run_hashing(_checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def needs_rehash(hashed_password):
+    """Check whether a hash was made with a lower cost factor than BCRYPT_ROUNDS. Stronger
+    hashes are kept, so lowering the setting never weakens stored passwords."""
+    try:
+        return int(hashed_password.split('$')[2]) < BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
 
 def validate_email(email):
     """Validate email format"""
@@ -73,10 +147,49 @@ def authenticate_user(identifier, password):
     else:
         user = User.query.filter_by(username=identifier).first()
     if user and verify_password(password, user.password_hash):
+        # Upgrade hashes made with an old cost factor while we have the plaintext
+        if needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            db.session.commit()
         return user
     return None
 
 def get_current_user():
     """Get the current user from JWT token"""
     user_id = get_jwt_identity()
-    return User.query.get(user_id) 
\ No newline at end of file
+    return User.query.get(user_id)
+
+# Read-only view of a user, cheap to cache and share between workers
+UserInfo = namedtuple('UserInfo', ['id', 'username', 'email', 'created_at'])
+
+# Seconds a cached user stays valid; bounds staleness for other workers when not using Redis
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 60))
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+user_cache = create_cache('user:', maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+def get_current_user_info():
+    """Get the current user as a UserInfo, skipping the database while it is cached.
+
+    Use this in handlers that only read the user; use get_current_user() to modify it.
+    """
+    user_id = get_jwt_identity()
+    cached = user_cache.get(user_id)
+    CACHE_LOOKUPS.labels('user', 'miss' if cached is None else 'hit').inc()
+    if cached is not None:
+        return UserInfo(**cached)
+
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+    info = UserInfo(user.id, user.username, user.email, user.created_at.isoformat())
+    user_cache.set(user_id, info._asdict())
+    return info
+
+def invalidate_user(user_id):
+    """Drop a user from the identity cache after their account changes"""
+    user_cache.delete(user_id)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_cached_user(mapper, connection, target):
+    invalidate_user(target.id)
@@ -0,0 +1,261 @@
+"""Load-test the API endpoints and compare throughput and latency with a stored baseline.
+
+By default a local gunicorn is started on a fresh SQLite database (migrated with
+`flask db upgrade`); pass --database-uri for Postgres or --base-url for a running server:
+
+    python backend/benchmarks/api_suite.py --save-baseline backend/benchmarks/baselines/sqlite.json
+    python backend/benchmarks/api_suite.py --baseline backend/benchmarks/baselines/sqlite.json
+    python backend/benchmarks/api_suite.py --database-uri postgresql://tasks@localhost/tasks_bench \\
+        --baseline backend/benchmarks/baselines/postgresql.json
+
+For each size in --sizes a user is seeded with that many tasks (through POST /tasks/import)
+and list/create/update/delete are driven from --concurrency client threads. Register and
+login run once per suite since they don't depend on task count. Exits non-zero when a
+scenario's throughput drops, or a --gate latency percentile grows, by more than --threshold
+against the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+PASSWORD = "Benchmark-Pass-123!"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Server:
+    """gunicorn serving the app on a migrated database, stopped on exit"""
+
+    def __init__(self, database_uri, port, workers, threads, worker_class, db_latency_ms=0):
+        self.tmpdir = tempfile.mkdtemp(prefix='api-suite-')
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.env = dict(
+            os.environ,
+            POSTGRES_URI=database_uri or f"sqlite:///{os.path.join(self.tmpdir, 'bench.db')}",
+            JWT_SECRET_KEY=os.environ.get('JWT_SECRET_KEY', 'benchmark-secret-key-benchmark-secret'),
+            RATELIMIT_ENABLED='false',
+            EMAIL_WORKER='off',
+            PROMETHEUS_MULTIPROC_DIR=os.path.join(self.tmpdir, 'prometheus'),
+            GUNICORN_WORKER_CLASS=worker_class,
+            BENCH_DB_LATENCY_MS=str(db_latency_ms),
+        )
+        target = ['--pythonpath', os.path.dirname(os.path.abspath(__file__)), 'latency_app:app'] \
+            if db_latency_ms else ['backend.wsgi:app']
+        self.args = [
+            sys.executable, '-m', 'gunicorn', '--config', os.path.join(ROOT, 'backend', 'gunicorn.conf.py'),
+            '--workers', str(workers), '--threads', str(threads), '--bind', f"127.0.0.1:{port}",
+            '--log-level', 'warning', *target,
+        ]
+        self.process = None
+
+    def __enter__(self):
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'backend.app', 'db', 'upgrade'],
+                       cwd=ROOT, env=self.env, check=True, capture_output=True)
+        self.process = subprocess.Popen(self.args, cwd=ROOT, env=self.env)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {self.process.returncode}")
+            try:
+                if requests.get(f"{self.base_url}/health/ready", timeout=1).ok:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError("gunicorn did not become ready")
+
+    def __exit__(self, *exc):
+        if self.process:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+def register(session, base_url):
+    username = f"bench_{uuid.uuid4().hex[:12]}"
+    response = session.post(f"{base_url}/auth/register", json={
+        "username": username, "email": f"{username}@example.com", "password": PASSWORD,
+    })
+    response.raise_for_status()
+    return username, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def seed(session, base_url, headers, count):
+    body = "".join(json.dumps({"task": f"Seeded task {i}", "priority": "medium"}) + "\n" for i in range(count))
+    response = session.post(f"{base_url}/tasks/import?format=ndjson", data=body.encode('utf-8'), headers=headers)
+    response.raise_for_status()
+    summary = json.loads(response.text.splitlines()[-1])
+    assert summary["inserted"] == count, summary
+
+
+def run_scenario(requests_count, concurrency, repeat, make_request):
+    """Call make_request(session, i) requests_count times per round, for `repeat` rounds
+    (i is unique across rounds). Returns the best round's throughput and percentiles,
+    since on a shared machine noise only ever makes a round slower."""
+    sessions = [requests.Session() for _ in range(concurrency)]
+
+    def worker(index):
+        session = sessions[index % concurrency]
+        start = time.perf_counter()
+        make_request(session, index).raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    rounds = []
+    for round_number in range(repeat):
+        indexes = range(round_number * requests_count, (round_number + 1) * requests_count)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(worker, indexes))
+        rounds.append((requests_count / (time.perf_counter() - started), samples))
+    return {
+        "requests": requests_count,
+        "throughput": round(max(throughput for throughput, _ in rounds), 1),
+        "p50": round(min(percentile(samples, 50) for _, samples in rounds), 2),
+        "p95": round(min(percentile(samples, 95) for _, samples in rounds), 2),
+        "p99": round(min(percentile(samples, 99) for _, samples in rounds), 2),
+    }
+
+
+def run_suite(base_url, sizes, requests_count, auth_requests, concurrency, repeat):
+    results = {}
+    session = requests.Session()
+    username, headers = register(session, base_url)
+
+    results["register"] = run_scenario(auth_requests, concurrency, repeat, lambda s, i: s.post(
+        f"{base_url}/auth/register",
+        json={"username": f"r{i}_{uuid.uuid4().hex[:10]}", "email": f"r{i}_{uuid.uuid4().hex[:10]}@example.com",
+              "password": PASSWORD}))
+    results["login"] = run_scenario(auth_requests, concurrency, repeat, lambda s, i: s.post(
+        f"{base_url}/auth/login", json={"username": username, "password": PASSWORD}))
+
+    for size in sizes:
+        _, headers = register(session, base_url)
+        seed(session, base_url, headers, size)
+
+        results[f"list@{size}"] = run_scenario(requests_count, concurrency, repeat, lambda s, i: s.get(
+            f"{base_url}/tasks", headers=headers))
+
+        created = [None] * (requests_count * repeat)
+
+        def create(s, i):
+            response = s.post(f"{base_url}/tasks", json={"task": f"Benchmark task {i}"}, headers=headers)
+            if response.ok:
+                created[i] = response.json()["id"]
+            return response
+
+        results[f"create@{size}"] = run_scenario(requests_count, concurrency, repeat, create)
+        results[f"update@{size}"] = run_scenario(requests_count, concurrency, repeat, lambda s, i: s.put(
+            f"{base_url}/tasks/{created[i]}", json={"completed": True, "priority": "high"}, headers=headers))
+        results[f"delete@{size}"] = run_scenario(requests_count, concurrency, repeat, lambda s, i: s.delete(
+            f"{base_url}/tasks/{created[i]}", headers=headers))
+    return results
+
+
+def compare(results, baseline, threshold, gated):
+    """Print each scenario's change against the baseline; return the names whose gated
+    metrics (throughput and/or latency percentiles) regressed by more than `threshold`"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:>16}: no baseline")
+            continue
+        changes = {metric: result[metric] / base[metric] - 1 for metric in ("throughput", "p50", "p95", "p99")}
+        regressed = any(
+            changes[metric] < -threshold if metric == "throughput" else changes[metric] > threshold
+            for metric in gated
+        )
+        print(f"{name:>16}: " + "  ".join(f"{metric} {change:+7.1%}" for metric, change in changes.items())
+              + ("  REGRESSION" if regressed else ""))
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="benchmark a running server instead of starting gunicorn")
+    parser.add_argument("--database-uri", help="database for the local gunicorn (default: a temporary SQLite file)")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4, help="threads per gthread worker")
+    parser.add_argument("--worker-class", default="gthread", choices=["sync", "gthread", "gevent"])
+    parser.add_argument("--db-latency-ms", type=float, default=0,
+                        help="simulated round trip before each SQL statement (see latency_app.py)")
+    parser.add_argument("--sizes", default="100,1000,10000,100000", help="comma-separated tasks per seeded user")
+    parser.add_argument("--requests", type=int, default=100, help="requests per task scenario round")
+    parser.add_argument("--auth-requests", type=int, default=12, help="requests per register/login scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3, help="rounds per scenario; the best is reported")
+    parser.add_argument("--baseline", help="JSON baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--gate", default="throughput,p50",
+                        help="metrics checked against the threshold (throughput,p50,p95,p99); tail "
+                             "percentiles are noisy on shared machines")
+    parser.add_argument("--save-baseline", help="write the results to this JSON file")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    def suite(base_url):
+        return run_suite(base_url, sizes, args.requests, args.auth_requests, args.concurrency, args.repeat)
+
+    if args.base_url:
+        results = suite(args.base_url)
+    else:
+        with Server(args.database_uri, args.port, args.workers, args.threads, args.worker_class,
+                    args.db_latency_ms) as server:
+            results = suite(server.base_url)
+
+    for name, result in results.items():
+        print(f"{name:>16}: {result['throughput']:8.1f} req/s  p50={result['p50']:7.1f}ms "
+              f"p95={result['p95']:7.1f}ms p99={result['p99']:7.1f}ms")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                "environment": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpus": os.cpu_count(),
+                    "database": (args.database_uri or "sqlite").split(':')[0],
+                    "workers": args.workers,
+                    "worker_class": args.worker_class,
+                    "threads": args.threads,
+                    "concurrency": args.concurrency,
+                    "repeat": args.repeat,
+                    "db_latency_ms": args.db_latency_ms,
+                },
+                "results": results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.gate.split(','))
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""The app with a simulated network round trip before every SQL statement.
+
+Used by `api_suite.py --db-latency-ms` so a local SQLite database behaves like a remote
+one, where workers spend most of a request waiting on I/O. The delay is time.sleep, which
+releases the GIL under threads and yields to other greenlets under gevent.
+"""
+import os
+import time
+
+from sqlalchemy import event
+
+from backend.app import create_app, db
+
+DB_LATENCY = float(os.environ.get('BENCH_DB_LATENCY_MS', 0)) / 1000
+
+
+def _delay(conn, cursor, statement, parameters, context, executemany):
+    time.sleep(DB_LATENCY)
+
+
+app = create_app()
+with app.app_context():
+    event.listen(db.engine, 'before_cursor_execute', _delay)
@@ -0,0 +1,97 @@
+"""Measure the per-request cost of rate limiting.
+
+Runs in-process against an in-memory database:
+
+    python backend/benchmarks/limiter_overhead.py [--storage-uri redis://localhost:6379/0]
+
+Reports the cost of a raw limit check for each strategy on the chosen storage, and the
+end-to-end cost of GET /auth/profile with the limiter on and off.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-benchmark-secret')
+os.environ.setdefault('POSTGRES_URI', 'sqlite:///:memory:')
+os.environ.setdefault('EMAIL_WORKER', 'off')
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+
+from limits import parse, strategies
+from limits.storage import storage_from_string
+
+STRATEGIES = {
+    'fixed-window': strategies.FixedWindowRateLimiter,
+    'moving-window': strategies.MovingWindowRateLimiter,
+    'sliding-window-counter': strategies.SlidingWindowCounterRateLimiter,
+}
+
+
+def time_per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def bench_strategies(storage_uri, iterations):
+    storage = storage_from_string(storage_uri)
+    limit = parse("1000000 per hour")
+    for name, strategy_class in STRATEGIES.items():
+        try:
+            strategy = strategy_class(storage)
+        except NotImplementedError:
+            print(f"{name:>24}: not supported by {storage_uri}")
+            continue
+        storage.reset()
+        cost = time_per_call(lambda: strategy.hit(limit, "bench", "user:1"), iterations)
+        print(f"{name:>24}: {cost:8.1f}us per hit")
+
+
+def bench_requests(iterations):
+    from backend.app import create_app, db, limiter
+
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        response = client.post("/auth/register", json={
+            "username": "bench",
+            "email": "bench@example.com",
+            "password": "Benchmark-Pass-123!",
+        })
+        headers = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+        # Warm caches and imports
+        for _ in range(50):
+            client.get("/auth/profile", headers=headers)
+
+        results = {}
+        for enabled in (False, True):
+            limiter.enabled = enabled
+            limiter.reset()
+            results[enabled] = time_per_call(lambda: client.get("/auth/profile", headers=headers), iterations)
+
+    print(f"{'limiter off':>24}: {results[False]:8.1f}us per request")
+    print(f"{'limiter on':>24}: {results[True]:8.1f}us per request "
+          f"(+{results[True] - results[False]:.1f}us, {app.config['RATELIMIT_STRATEGY']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--storage-uri", default="memory://")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ['RATELIMIT_STORAGE_URI'] = args.storage_uri
+    # High enough that the benchmark itself never gets limited
+    os.environ['RATELIMIT_DEFAULT'] = '1000000 per hour'
+    print(f"Limit check cost on {args.storage_uri}:")
+    bench_strategies(args.storage_uri, args.iterations)
+    print("GET /auth/profile:")
+    bench_requests(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Measure GET /tasks latency while a burst of logins is hashing passwords.
+
+Start the API without rate limiting, then point this script at it:
+
+    RATELIMIT_ENABLED=false gunicorn --workers 3 --threads 4 --bind 127.0.0.1:5000 backend.wsgi:app
+    python backend/benchmarks/login_burst.py --base-url http://127.0.0.1:5000
+
+Exits non-zero when the p99 under the burst exceeds --max-ratio times the idle p99.
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+PASSWORD = "Benchmark-Pass-123!"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(label, samples):
+    print(f"{label:>12}: n={len(samples):<5} p50={percentile(samples, 50):7.1f}ms "
+          f"p95={percentile(samples, 95):7.1f}ms p99={percentile(samples, 99):7.1f}ms "
+          f"mean={statistics.mean(samples):7.1f}ms")
+
+
+def register(base_url):
+    username = f"bench_{uuid.uuid4().hex[:12]}"
+    response = requests.post(f"{base_url}/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": PASSWORD,
+    })
+    response.raise_for_status()
+    return username, response.json()["access_token"]
+
+
+def time_task_list(session, base_url, headers, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = session.get(f"{base_url}/tasks", headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return samples
+
+
+def login_burst(base_url, username, stop):
+    session = requests.Session()
+    logins = 0
+    while not stop.is_set():
+        response = session.post(f"{base_url}/auth/login", json={"username": username, "password": PASSWORD})
+        response.raise_for_status()
+        logins += 1
+    return logins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--requests", type=int, default=200, help="GET /tasks requests per phase")
+    parser.add_argument("--login-threads", type=int, default=8, help="concurrent clients logging in")
+    parser.add_argument("--tasks", type=int, default=50, help="tasks to seed for the reader")
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args()
+
+    _, token = register(args.base_url)
+    headers = {"Authorization": f"Bearer {token}"}
+    session = requests.Session()
+    for i in range(args.tasks):
+        session.post(f"{args.base_url}/tasks", json={"task": f"Benchmark task {i}"}, headers=headers).raise_for_status()
+    burst_user, _ = register(args.base_url)
+
+    idle = time_task_list(session, args.base_url, headers, args.requests)
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=args.login_threads) as pool:
+        burst = [pool.submit(login_burst, args.base_url, burst_user, stop) for _ in range(args.login_threads)]
+        loaded = time_task_list(session, args.base_url, headers, args.requests)
+        stop.set()
+        logins = sum(future.result() for future in burst)
+
+    summarize("idle", idle)
+    summarize("login burst", loaded)
+    ratio = percentile(loaded, 99) / percentile(idle, 99)
+    print(f"{logins} logins during the burst; p99 ratio {ratio:.2f} (max {args.max_ratio})")
+    return 0 if ratio <= args.max_ratio else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Compare serialization paths for a page of tasks.
+
+    python backend/benchmarks/serialization.py [--tasks 10000]
+
+ORM objects + Task.to_dict() + stdlib JSON (the original GET /tasks path) against
+column rows + orjson (the current path), plus the mixed combinations.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-benchmark-secret')
+os.environ.setdefault('POSTGRES_URI', 'sqlite:///:memory:')
+os.environ.setdefault('EMAIL_WORKER', 'off')
+
+from backend.app import create_app, db
+from backend.json_provider import IsoJSONProvider, OrjsonProvider, orjson
+from backend.models import User, Task
+
+
+def seed(count):
+    user = User(username="bench", email="bench@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    now = datetime.utcnow()
+    db.session.add_all([
+        Task(f"Benchmark task {i}", "medium", "To Do", now + timedelta(days=i % 30), user.id)
+        for i in range(count)
+    ])
+    db.session.commit()
+    return user.id
+
+
+def orm_dicts(user_id):
+    return [task.to_dict() for task in Task.query.filter_by(user_id=user_id).all()]
+
+
+def row_dicts(user_id):
+    return [row._asdict() for row in Task.query.filter_by(user_id=user_id).with_entities(*Task.api_columns())]
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    providers = [("stdlib", IsoJSONProvider(app))]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider(app)))
+
+    with app.app_context():
+        db.create_all()
+        user_id = seed(args.tasks)
+        print(f"{args.tasks} tasks, best of {args.repeat}:")
+        for fetch_name, fetch in (("ORM + to_dict", orm_dicts), ("column rows", row_dicts)):
+            for provider_name, provider in providers:
+                with app.test_request_context():
+                    elapsed = best_of(lambda: provider.response(fetch(user_id)).get_data(), args.repeat)
+                print(f"{fetch_name:>14} + {provider_name:<6}: {elapsed:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare task key layouts: text UUIDv4 (the old String(36) keys) against 16-byte UUIDv4 and UUIDv7.
+
+    python backend/benchmarks/uuid_keys.py [--rows 200000] [--users 100]
+
+Inserts --rows tasks spread over --users users into a fresh on-disk SQLite database per
+layout, in 1000-row transactions like POST /tasks/import, and reports rows per second and
+the size of the primary key and (user_id, created_at, id) indexes from the dbstat table.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table, Text, create_engine, insert, text
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.models import BinaryUUID, new_id
+
+LAYOUTS = [
+    ("text uuid4", String(36), lambda: str(uuid.uuid4())),
+    ("binary uuid4", BinaryUUID(), lambda: str(uuid.uuid4())),
+    ("binary uuid7", BinaryUUID(), new_id),
+]
+BATCH_SIZE = 1000
+
+
+def task_table(key_type):
+    table = Table(
+        'task', MetaData(),
+        Column('id', key_type, primary_key=True),
+        Column('task', Text, nullable=False),
+        Column('created_at', DateTime, nullable=False),
+        Column('user_id', key_type, nullable=False),
+    )
+    Index('ix_task_user_id_created_at', table.c.user_id, table.c.created_at, table.c.id)
+    return table
+
+
+def index_sizes(conn):
+    rows = conn.execute(text(
+        "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ('sqlite_autoindex_task_1', "
+        "'ix_task_user_id_created_at') GROUP BY name"
+    )).all()
+    return {name: size for name, size in rows}
+
+
+def run(key_type, make_id, rows, user_ids, directory):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, f'{uuid.uuid4().hex}.db')}")
+    table = task_table(key_type)
+    table.metadata.create_all(engine)
+    start_time = datetime.utcnow()
+
+    start = time.perf_counter()
+    for offset in range(0, rows, BATCH_SIZE):
+        batch = [
+            {"id": make_id(), "task": f"Task {i}", "created_at": start_time + timedelta(microseconds=i),
+             "user_id": random.choice(user_ids)}
+            for i in range(offset, min(offset + BATCH_SIZE, rows))
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+    elapsed = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        sizes = index_sizes(conn)
+    engine.dispose()
+    return rows / elapsed, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    user_ids = [new_id() for _ in range(args.users)]
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{args.rows} tasks over {args.users} users:")
+        for name, key_type, make_id in LAYOUTS:
+            throughput, sizes = run(key_type, make_id, args.rows, user_ids, directory)
+            print(f"{name:>14}: {throughput:9,.0f} rows/s  primary key {sizes['sqlite_autoindex_task_1'] / 2**20:6.1f} MiB"
+                  f"  (user_id, created_at, id) {sizes['ix_task_user_id_created_at'] / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Set to share caches between gunicorn workers and instances, e.g. redis://localhost:6379/0
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+
+
+class LocalCache:
+    """Thread-safe in-process LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+class RedisCache:
+    """Cache with the LocalCache interface kept in Redis and shared by every worker.
+
+    Values must be JSON-serializable. Hit/miss counters are per process.
+    """
+
+    def __init__(self, url, prefix, ttl=60, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_REDIS_URL is set but the 'redis' package is not installed") from e
+            client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._client = client
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            # A TTL of 0 disables caching; Redis rejects a zero expiry
+            return
+        self._client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def create_cache(prefix, maxsize=1024, ttl=60):
+    """Build a shared Redis cache when CACHE_REDIS_URL is set, otherwise a per-process one"""
+    if CACHE_REDIS_URL:
+        return RedisCache(CACHE_REDIS_URL, prefix, ttl=ttl)
+    return LocalCache(maxsize=maxsize, ttl=ttl)
@@ -0,0 +1,62 @@
+import os
+import time
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from .metrics import DB_POOL_CHECKOUT_WAIT, DB_POOL_CONNECTIONS
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports checkout waits (including time spent opening a new connection)
+    and its in-use and idle connection counts to Prometheus"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+            self._report_connections()
+
+    def _do_return_conn(self, record):
+        try:
+            super()._do_return_conn(record)
+        finally:
+            self._report_connections()
+
+    def _report_connections(self):
+        DB_POOL_CONNECTIONS.labels('in_use').set(self.checkedout())
+        DB_POOL_CONNECTIONS.labels('idle').set(self.checkedin())
+
+
+def _env_int(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def engine_options_from_env(database_uri):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from DB_* environment variables.
+
+    Pool sizing only applies to server databases; SQLite keeps the pool Flask-SQLAlchemy picks.
+    """
+    options = {
+        # Test connections on checkout so a database failover doesn't surface as request errors
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() != 'false',
+    }
+    recycle = _env_int('DB_POOL_RECYCLE')
+    if recycle is not None:
+        options['pool_recycle'] = recycle
+
+    url = make_url(database_uri)
+    if url.get_backend_name() == 'sqlite':
+        return options
+
+    options['poolclass'] = TimedQueuePool
+    options['pool_size'] = _env_int('DB_POOL_SIZE', 5)
+    options['max_overflow'] = _env_int('DB_MAX_OVERFLOW', 10)
+    options['pool_timeout'] = _env_int('DB_POOL_TIMEOUT', 30)
+
+    statement_timeout = _env_int('DB_STATEMENT_TIMEOUT_MS')
+    if statement_timeout and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
@@ -1,28 +1,219 @@
 import os
-import smtplib
-from email.message import EmailMessage
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from .metrics import EMAIL_SEND_TIME
+from .models import db, OutboxEmail
+from .reset_tokens import mint_reset_token
 
 SMTP_HOST = os.environ.get('SMTP_HOST', 'localhost')
 SMTP_PORT = int(os.environ.get('SMTP_PORT', 587))
 SMTP_USER = os.environ.get('SMTP_USER')
 SMTP_PASS = os.environ.get('SMTP_PASS')
 SMTP_FROM = os.environ.get('SMTP_FROM', SMTP_USER)
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', 'true').lower() != 'false'
+SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', 10))
+# Pooled connections idle longer than this are closed instead of reused
+SMTP_IDLE_TIMEOUT = float(os.environ.get('SMTP_IDLE_TIMEOUT', 60))
+
+# 'thread' delivers from a background thread in each app process;
+# 'off' leaves delivery to `flask deliver-emails` running elsewhere
+EMAIL_WORKER = os.environ.get('EMAIL_WORKER', 'thread').lower()
+EMAIL_POLL_INTERVAL = float(os.environ.get('EMAIL_POLL_INTERVAL', 30))
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', 50))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', 5))
+# Retry delay in seconds, doubled after every failed attempt up to EMAIL_RETRY_MAX
+EMAIL_RETRY_BASE = float(os.environ.get('EMAIL_RETRY_BASE', 30))
+EMAIL_RETRY_MAX = float(os.environ.get('EMAIL_RETRY_MAX', 3600))
+# How long a sender owns a claimed message before another sender may retry it
+EMAIL_CLAIM_SECONDS = 300
+# Replaced with a freshly minted token in mail queued with a reset_token_id
+RESET_TOKEN_PLACEHOLDER = '{reset_token}'
+
+# One authenticated connection per delivering thread
+_local = threading.local()
+
+
+def _connect():
+    # smtplib and email are only needed by processes that deliver mail
+    import smtplib
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    if SMTP_STARTTLS:
+        server.starttls()
+    if SMTP_USER and SMTP_PASS:
+        server.login(SMTP_USER, SMTP_PASS)
+    return server
+
+
+def _get_connection():
+    server = getattr(_local, 'server', None)
+    if server is not None and time.monotonic() - _local.last_used > SMTP_IDLE_TIMEOUT:
+        close_connection()
+        server = None
+    if server is None:
+        server = _connect()
+        _local.server = server
+        _local.last_used = time.monotonic()
+    return server
+
+
+def close_connection():
+    """Close this thread's pooled SMTP connection, if any"""
+    server = getattr(_local, 'server', None)
+    _local.server = None
+    if server is not None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
 
 
 def send_email(to, subject, body):
+    """Send one email synchronously over the pooled connection"""
+    import smtplib
+    from email.message import EmailMessage
     msg = EmailMessage()
     msg['Subject'] = subject
     msg['From'] = SMTP_FROM
     msg['To'] = to
     msg.set_content(body)
 
+    start = time.perf_counter()
+    result = 'failed'
     try:
-        print(f"SMTP_HOST={SMTP_HOST}, SMTP_PORT={SMTP_PORT}, SMTP_USER={SMTP_USER}, SMTP_FROM={SMTP_FROM}")
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            if SMTP_USER and SMTP_PASS:
-                server.login(SMTP_USER, SMTP_PASS)
-            server.send_message(msg)
+        try:
+            _get_connection().send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # The relay dropped our pooled connection; reconnect once
+            close_connection()
+            _get_connection().send_message(msg)
+        _local.last_used = time.monotonic()
+        result = 'sent'
+    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+        # The connection is still usable, only this message was rejected
+        _local.last_used = time.monotonic()
+        result = 'rejected'
+        raise
     except Exception as e:
         print(f"Error sending email: {e}")
-        raise 
\ No newline at end of file
+        close_connection()
+        raise
+    finally:
+        EMAIL_SEND_TIME.labels(result).observe(time.perf_counter() - start)
+
+
+def enqueue_email(to, subject, body, reset_token_id=None):
+    """Queue an email for background delivery. The caller commits the session.
+
+    With `reset_token_id`, RESET_TOKEN_PLACEHOLDER in the body is replaced at send time by
+    a token minted for that row, so no usable token is stored with the queued mail.
+    """
+    db.session.add(OutboxEmail(recipient=to, subject=subject, body=body, reset_token_id=reset_token_id))
+
+
+def _retry_delay(attempts):
+    return min(EMAIL_RETRY_BASE * (2 ** (attempts - 1)), EMAIL_RETRY_MAX)
+
+
+def deliver_pending(limit=None):
+    """Send queued emails that are due. Must run inside an app context.
+
+    Returns a (sent, failed) tuple for this pass.
+    """
+    now = datetime.utcnow()
+    due = (
+        db.session.query(OutboxEmail.id, OutboxEmail.next_attempt_at)
+        .filter(OutboxEmail.status == 'pending', OutboxEmail.next_attempt_at <= now)
+        .order_by(OutboxEmail.next_attempt_at)
+        .limit(limit or EMAIL_BATCH_SIZE)
+        .all()
+    )
+
+    sent = failed = 0
+    for email_id, next_attempt_at in due:
+        # Claim the message by moving its next attempt into the future. Only one
+        # sender's UPDATE can match the old value, so concurrent workers never double-send.
+        claimed = db.session.execute(
+            update(OutboxEmail)
+            .where(OutboxEmail.id == email_id, OutboxEmail.next_attempt_at == next_attempt_at)
+            .values(next_attempt_at=now + timedelta(seconds=EMAIL_CLAIM_SECONDS))
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            continue
+
+        email = db.session.get(OutboxEmail, email_id)
+        body = email.body
+        if email.reset_token_id is not None:
+            token = mint_reset_token(email.reset_token_id)
+            if token is None:
+                # The token was used, expired or replaced, so the link would be dead
+                db.session.delete(email)
+                db.session.commit()
+                continue
+            # Committed before sending so the link works as soon as it arrives
+            db.session.commit()
+            body = body.replace(RESET_TOKEN_PLACEHOLDER, token)
+        try:
+            send_email(email.recipient, email.subject, body)
+        except Exception as e:
+            email.attempts += 1
+            email.last_error = str(e)
+            if email.attempts >= EMAIL_MAX_ATTEMPTS:
+                # Give up, and don't keep reset links around in the database
+                email.status = 'failed'
+                email.body = ''
+            else:
+                email.next_attempt_at = datetime.utcnow() + timedelta(seconds=_retry_delay(email.attempts))
+            failed += 1
+        else:
+            db.session.delete(email)
+            sent += 1
+        db.session.commit()
+
+    return sent, failed
+
+
+class EmailWorker:
+    """Background thread that drains the outbox, woken early whenever mail is queued"""
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, app):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(app,), name='email-worker', daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, app):
+        while not self._stop.is_set():
+            self._wakeup.wait(EMAIL_POLL_INTERVAL)
+            self._wakeup.clear()
+            try:
+                with app.app_context():
+                    while not self._stop.is_set():
+                        sent, failed = deliver_pending()
+                        if sent + failed < EMAIL_BATCH_SIZE:
+                            break
+            except Exception:
+                traceback.print_exc()
+        close_connection()
+
+
+email_worker = EmailWorker()
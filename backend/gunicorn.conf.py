@@ -0,0 +1,36 @@
+# Loaded automatically by gunicorn when started from this directory (see Dockerfile)
+import os
+import shutil
+
+# gthread (default) or gevent. gevent serves many concurrent I/O-bound requests per
+# worker; raise DB_POOL_SIZE to match, since each in-flight request may hold a connection
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('WEB_CONCURRENCY', 3))
+# Threads per gthread worker / concurrent requests per gevent worker
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+
+
+def on_starting(server):
+    # Metric files from a previous run would be merged into this one's totals
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def post_worker_init(worker):
+    if worker.cfg.worker_class_str == 'gevent':
+        # psycopg2 is a C extension that gevent's monkey patching can't reach; make its
+        # waits cooperative so a slow query doesn't block every greenlet in the worker
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            pass  # psycogreen or psycopg2 not installed, e.g. SQLite in development
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
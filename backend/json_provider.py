@@ -0,0 +1,48 @@
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency; fall back to the stdlib encoder
+    orjson = None
+
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """Stdlib JSON provider that writes dates as ISO 8601 (like Task.to_dict) instead of HTTP dates"""
+
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (date, datetime)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(IsoJSONProvider):
+    """JSON provider backed by orjson, which encodes dicts and datetimes natively in C"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        return self._app.response_class(orjson.dumps(obj, default=self.default), mimetype=self.mimetype)
+
+
+def init_json_provider(app, name='auto'):
+    """Install the JSON provider named by `name`: 'orjson', 'stdlib', or 'auto' (orjson if installed)"""
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name == 'orjson':
+        if orjson is None:
+            raise RuntimeError("JSON_PROVIDER=orjson but the 'orjson' package is not installed")
+        app.json = OrjsonProvider(app)
+    elif name == 'stdlib':
+        app.json = IsoJSONProvider(app)
+    else:
+        raise RuntimeError(f"Unknown JSON_PROVIDER '{name}'")
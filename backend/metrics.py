@@ -0,0 +1,132 @@
+import os
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess,
+)
+
+# Set METRICS_ENABLED=false to skip the request and query hooks entirely
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() != 'false'
+# When set, GET /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Under gunicorn, each worker writes its samples here and /metrics merges them
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if MULTIPROC_DIR:
+    # CLI commands (flask db upgrade) run without gunicorn's on_starting hook creating it
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+# Request latencies are mostly a few ms; the top buckets catch bcrypt and exports
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response', ['method', 'route'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter('http_requests_total', 'Responses by status code', ['method', 'route', 'status'])
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL statements executed per request', ['route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50),
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_seconds', 'Time spent in SQL statements per request', ['route'],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter('db_queries_total', 'SQL statements executed, in and out of requests')
+CACHE_LOOKUPS = Counter('cache_lookups_total', 'Cache lookups by outcome', ['cache', 'result'])
+PASSWORD_HASH_TIME = Histogram(
+    'password_hash_duration_seconds', 'bcrypt time, including any wait for a hashing worker', ['operation'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', 'Time to get a pooled connection, including opening a new one',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+# Summed over live workers; updated by TimedQueuePool on every checkout and return
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Pooled database connections by state', ['state'], multiprocess_mode='livesum',
+)
+EMAIL_SEND_TIME = Histogram(
+    'email_send_duration_seconds', 'Time to hand one email to the SMTP relay', ['result'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+def _route():
+    # The URL rule, not the path, so task ids don't each become a label value
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+
+
+# Labelled children by (method, route, status); .labels() is the bulk of the per-request cost
+_children = {}
+
+
+def _request_children(method, route, status):
+    key = (method, route, status)
+    children = _children.get(key)
+    if children is None:
+        children = _children[key] = (
+            REQUEST_LATENCY.labels(method, route),
+            REQUESTS.labels(method, route, str(status)),
+            REQUEST_DB_QUERIES.labels(route),
+            REQUEST_DB_TIME.labels(route),
+        )
+    return children
+
+
+def _after_request(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    latency, count, queries, db_time = _request_children(request.method, _route(), response.status_code)
+    latency.observe(time.perf_counter() - start)
+    count.inc()
+    queries.observe(g.db_queries)
+    db_time.observe(g.db_seconds)
+    return response
+
+
+# The start time lives on the statement's execution context rather than the connection, so a
+# statement that raises (and never reaches after_cursor_execute) leaves nothing behind
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_metrics_query_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    DB_QUERIES.inc()
+    if has_request_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_seconds += elapsed
+
+
+def init_metrics(app):
+    """Register the request hooks and query listeners (unless METRICS_ENABLED=false)"""
+    if not METRICS_ENABLED:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def render_metrics():
+    """Return (body, content type) for the Prometheus text format, merging every worker's samples"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,39 @@
+"""add task updated_at and soft-delete tombstones
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 17:40:12.204913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    # Existing rows have never been modified since they were created
+    op.execute("UPDATE task SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_task_user_id_updated_at', ['user_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade():
+    # Tombstoned rows were deleted as far as clients are concerned
+    op.execute("DELETE FROM task WHERE deleted_at IS NOT NULL")
+
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_user_id_updated_at')
+        batch_op.drop_column('deleted_at')
+        batch_op.drop_column('updated_at')
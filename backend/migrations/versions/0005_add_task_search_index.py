@@ -0,0 +1,27 @@
+"""add task full-text search index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 19:05:41.318270
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 table + triggers on SQLite, GIN expression index on Postgres
+    create_search_index(op.get_bind())
+
+
+def downgrade():
+    drop_search_index(op.get_bind())
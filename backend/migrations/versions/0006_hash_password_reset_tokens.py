@@ -0,0 +1,57 @@
+"""hash password reset tokens
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 21:02:14.508913
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+reset_token = sa.table(
+    'password_reset_token',
+    sa.column('id', sa.String),
+    sa.column('token', sa.String),
+    sa.column('token_hash', sa.LargeBinary),
+    sa.column('used', sa.Boolean),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('password_reset_token', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True))
+
+    # Outstanding tokens keep working: store each one's digest in place of the token
+    connection = op.get_bind()
+    for token_id, token in connection.execute(sa.select(reset_token.c.id, reset_token.c.token)).all():
+        connection.execute(
+            reset_token.update().where(reset_token.c.id == token_id)
+            .values(token_hash=hashlib.sha256(token.encode('utf-8')).digest())
+        )
+
+    with op.batch_alter_table('password_reset_token', schema=None) as batch_op:
+        batch_op.alter_column('token_hash', existing_type=sa.LargeBinary(length=32), nullable=False)
+        batch_op.drop_column('token')
+        batch_op.create_index(
+            'ix_password_reset_token_token_hash', ['token_hash'], unique=True,
+            sqlite_where=reset_token.c.used.is_(False), postgresql_where=reset_token.c.used.is_(False),
+        )
+
+
+def downgrade():
+    # Raw tokens can't be recovered from their digests, so outstanding ones are dropped
+    op.execute(reset_token.delete())
+    with op.batch_alter_table('password_reset_token', schema=None) as batch_op:
+        batch_op.drop_index('ix_password_reset_token_token_hash')
+        batch_op.drop_column('token_hash')
+        batch_op.add_column(sa.Column('token', sa.String(length=128), nullable=False))
+        batch_op.create_unique_constraint('uq_password_reset_token_token', ['token'])
@@ -0,0 +1,82 @@
+"""store uuid keys as native uuid / 16-byte binary
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 21:48:37.120455
+
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from backend.models import BinaryUUID
+from backend.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+KEY_COLUMNS = {
+    'user': ['id'],
+    'task': ['id', 'user_id'],
+    'password_reset_token': ['id', 'user_id'],
+    'outbox_email': ['id'],
+}
+# Postgres won't change a key's type while a foreign key references it
+FOREIGN_KEYS = [
+    ('task_user_id_fkey', 'task'),
+    ('password_reset_token_user_id_fkey', 'password_reset_token'),
+]
+
+
+def _uuid_to_bytes(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+
+def _bytes_to_uuid(value):
+    return str(uuid.UUID(bytes=value)) if isinstance(value, bytes) else value
+
+
+def _convert_sqlite(function, new_type, old_type):
+    connection = op.get_bind()
+    connection.connection.driver_connection.create_function('convert_key', 1, function, deterministic=True)
+    # Rebuilding the task table renumbers its rowids, which the FTS index refers to
+    drop_search_index(connection)
+    for table, columns in KEY_COLUMNS.items():
+        # SQLite stores either representation in any column, so convert the values in place
+        # first; the rebuild below then only changes the declared type
+        assignments = ', '.join(f'{column} = convert_key({column})' for column in columns)
+        op.execute(f'UPDATE "{table}" SET {assignments}')
+        with op.batch_alter_table(table, schema=None, recreate='always') as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=old_type, type_=new_type, existing_nullable=False)
+    create_search_index(connection)
+
+
+def _convert_postgresql(new_type, using):
+    for name, table in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    for table, columns in KEY_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=new_type, postgresql_using=f'{column}::{using}')
+    for name, table in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, 'user', ['user_id'], ['id'])
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _convert_postgresql(postgresql.UUID(as_uuid=False), 'uuid')
+    else:
+        _convert_sqlite(_uuid_to_bytes, BinaryUUID(), sa.String(length=36))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _convert_postgresql(sa.String(length=36), 'text')
+    else:
+        _convert_sqlite(_bytes_to_uuid, sa.String(length=36), BinaryUUID())
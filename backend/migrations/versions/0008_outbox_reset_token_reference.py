@@ -0,0 +1,28 @@
+"""mint password reset tokens when the email is sent
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 23:12:40.315872
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.models import BinaryUUID
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('outbox_email', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reset_token_id', BinaryUUID(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('outbox_email', schema=None) as batch_op:
+        batch_op.drop_column('reset_token_id')
@@ -1,11 +1,66 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+import secrets
+import time
 import uuid
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
 
 db = SQLAlchemy()
 
+
+def uuid7():
+    """Time-ordered UUID (RFC 9562 version 7): a millisecond timestamp, 12 bits of
+    sub-millisecond time and 62 random bits. New keys sort after existing ones, so
+    primary key inserts append to the index instead of splitting random pages."""
+    ms, ns = divmod(time.time_ns(), 1_000_000)
+    value = ms << 80 | 0x7 << 76 | (ns * 4096 // 1_000_000) << 64 | 0x2 << 62 | secrets.randbits(62)
+    return uuid.UUID(int=value)
+
+
+def new_id():
+    return str(uuid7())
+
+
+class BinaryUUID(TypeDecorator):
+    """UUID stored as Postgres' native uuid and as 16 bytes elsewhere. Values are
+    strings in Python, so ids from URLs, JWTs and cursors compare directly."""
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            value = value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+        except (AttributeError, TypeError, ValueError):
+            # Not a UUID, so it can't match any row
+            return None
+        return str(value) if dialect.name == 'postgresql' else value.bytes
+
+    def literal_processor(self, dialect):
+        # For EXPLAIN and debugging output; LargeBinary can't render arbitrary bytes
+        def process(value):
+            value = self.process_bind_param(value, dialect)
+            if value is None:
+                return 'NULL'
+            return f"'{value}'" if isinstance(value, str) else f"X'{value.hex()}'"
+        return process
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == 'postgresql':
+            return value
+        return str(uuid.UUID(bytes=value))
+
 class User(db.Model):
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
@@ -16,14 +71,26 @@ class User(db.Model):
         return f'<User {self.username}>'
 
 class Task(db.Model):
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     task = db.Column(db.Text, nullable=False)
     priority = db.Column(db.String(20), default='medium')
     completed = db.Column(db.Boolean, default=False)
     status = db.Column(db.String(50), default='To Do')
     due_date = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Soft-delete tombstone so offline clients can learn about deletions via /tasks/changes
+    deleted_at = db.Column(db.DateTime, nullable=True)
+    user_id = db.Column(BinaryUUID, db.ForeignKey('user.id'), nullable=False)
+
+    # Every task query is scoped to one user, so lead each index with user_id.
+    # (user_id, created_at, id) also serves the keyset ordering used by GET /tasks.
+    __table_args__ = (
+        db.Index('ix_task_user_id_created_at', 'user_id', 'created_at', 'id'),
+        db.Index('ix_task_user_id_status', 'user_id', 'status'),
+        db.Index('ix_task_user_id_due_date', 'user_id', 'due_date'),
+        db.Index('ix_task_user_id_updated_at', 'user_id', 'updated_at', 'id'),
+    )
 
     def __init__(self, task, priority, status, due_date, user_id):
         self.task = task
@@ -41,16 +108,61 @@ class Task(db.Model):
             'status': self.status,
             'dueDate': self.due_date.isoformat() if self.due_date else None,
             'createdAt': self.created_at.isoformat(),
+            'updatedAt': self.updated_at.isoformat(),
             'userId': self.user_id
         }
     
+    @classmethod
+    def api_columns(cls):
+        """Columns labelled with the to_dict() keys, for serializing rows without loading Task objects"""
+        return (
+            cls.id,
+            cls.task,
+            cls.priority,
+            cls.completed,
+            cls.status,
+            cls.due_date.label('dueDate'),
+            cls.created_at.label('createdAt'),
+            cls.updated_at.label('updatedAt'),
+            cls.user_id.label('userId'),
+        )
+
     def __repr__(self):
         return f'<Task {self.task}>' 
 
 class PasswordResetToken(db.Model):
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
-    token = db.Column(db.String(128), unique=True, nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    id = db.Column(BinaryUUID, primary_key=True, default=new_id)
+    user_id = db.Column(BinaryUUID, db.ForeignKey('user.id'), nullable=False, index=True)
+    # SHA-256 of the token emailed to the user; the token itself is never stored
+    token_hash = db.Column(db.LargeBinary(32), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     used = db.Column(db.Boolean, default=False)
-    user = db.relationship('User', backref='reset_tokens') 
\ No newline at end of file
+    user = db.relationship('User', backref='reset_tokens')
+
+    # Lookups only want unused tokens, and the sweeper deletes used and expired ones,
+    # so the index stays small. Queries must filter on used.is_(False) to match it.
+    __table_args__ = (
+        db.Index(
+            'ix_password_reset_token_token_hash', 'token_hash', unique=True,
+            sqlite_where=used.is_(False), postgresql_where=used.is_(False),
+        ),
+    )
+
+class OutboxEmail(db.Model):
+    """Outgoing email waiting to be delivered by the background sender in email_utils"""
+    id = db.Column(BinaryUUID, primary_key=True, default=new_id)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    # Password reset mail: the token is minted for this row when the mail is sent, so the
+    # outbox never holds a usable link
+    reset_token_id = db.Column(BinaryUUID, nullable=True)
+    status = db.Column(db.String(20), default='pending', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_outbox_email_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
@@ -0,0 +1,21 @@
+import base64
+import uuid
+from datetime import datetime
+
+
+def encode_cursor(timestamp, task_id):
+    """Encode a (timestamp, id) keyset position as an opaque URL-safe cursor"""
+    raw = f"{timestamp.isoformat()}|{task_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed, including
+    an id that isn't a UUID (it would bind as NULL and silently match nothing)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        timestamp, task_id = raw.split('|', 1)
+        return datetime.fromisoformat(timestamp), str(uuid.UUID(task_id))
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
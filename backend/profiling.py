@@ -0,0 +1,145 @@
+import cProfile
+import io
+import os
+import pstats
+import random
+import re
+import time
+from datetime import datetime
+from flask import g, request, has_request_context
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Profiling is off unless sampling or signed-header triggering is configured; when off,
+# init_profiling registers no hooks at all
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+# Signs X-Profile-Token headers (see `flask profile-token`) and authorizes /admin/profiles
+PROFILE_SECRET = os.environ.get('PROFILE_SECRET')
+PROFILE_TOKEN_MAX_AGE = int(os.environ.get('PROFILE_TOKEN_MAX_AGE', 3600))
+# Only profiled requests at least this slow are kept
+PROFILE_THRESHOLD_MS = float(os.environ.get('PROFILE_THRESHOLD_MS', 500))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(os.path.dirname(__file__), 'instance', 'profiles'))
+# Oldest reports are deleted beyond this many
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 50))
+
+PROFILE_NAME_PATTERN = re.compile(r'^[\w.-]+\.txt$')
+
+
+def profiling_enabled():
+    return PROFILE_SAMPLE_RATE > 0 or bool(PROFILE_SECRET)
+
+
+def _serializer():
+    return URLSafeTimedSerializer(PROFILE_SECRET, salt='profile-request')
+
+
+def create_profile_token(label='manual'):
+    """Token that makes requests carrying it in X-Profile-Token get profiled"""
+    return _serializer().dumps(label)
+
+
+def _token_is_valid(token):
+    if not PROFILE_SECRET:
+        return False
+    try:
+        _serializer().loads(token, max_age=PROFILE_TOKEN_MAX_AGE)
+    except BadSignature:
+        return False
+    return True
+
+
+def _should_profile():
+    token = request.headers.get('X-Profile-Token')
+    if token:
+        return _token_is_valid(token)
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _before_request():
+    if not _should_profile():
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return  # Python 3.12+ allows one active profiler; another thread's request has it
+    g.profiler = profiler
+    g.profile_sql = []
+    g.profile_start = time.perf_counter()
+
+
+def _after_request(response):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    elapsed_ms = (time.perf_counter() - g.pop('profile_start')) * 1000
+    statements = g.pop('profile_sql')
+    if elapsed_ms >= PROFILE_THRESHOLD_MS:
+        try:
+            write_report(profiler, statements, elapsed_ms, response.status_code)
+        except OSError as e:
+            print(f"Could not write profile: {e}")
+    return response
+
+
+# Timed like metrics._before_cursor_execute, on the statement's execution context
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and has_request_context() and g.get('profile_sql') is not None:
+        context._profile_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_profile_query_start', None)
+    if start is not None and has_request_context() and g.get('profile_sql') is not None:
+        g.profile_sql.append(((time.perf_counter() - start) * 1000, statement))
+
+
+def write_report(profiler, statements, elapsed_ms, status):
+    """Write a text report (request, SQL with timings, top functions) and trim the ring"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    route = re.sub(r'[^\w]+', '_', request.url_rule.rule if request.url_rule else 'unmatched').strip('_')
+    name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}-{request.method}-{route or 'root'}-{elapsed_ms:.0f}ms.txt"
+
+    out = io.StringIO()
+    out.write(f"{request.method} {request.full_path} -> {status} in {elapsed_ms:.1f}ms\n\n")
+    out.write(f"SQL: {len(statements)} statements, {sum(ms for ms, _ in statements):.1f}ms\n")
+    for ms, statement in statements:
+        out.write(f"{ms:8.2f}ms  {' '.join(statement.split())}\n")
+    out.write("\n")
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(50)
+
+    with open(os.path.join(PROFILE_DIR, name), 'w') as f:
+        f.write(out.getvalue())
+    _trim_ring()
+    return name
+
+
+def _trim_ring():
+    # Names start with a UTC timestamp, so everything past the cap is the oldest
+    for name in list_profiles()[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            pass  # another worker trimmed it first
+
+
+def list_profiles():
+    """Saved report names, newest first"""
+    try:
+        names = [name for name in os.listdir(PROFILE_DIR) if PROFILE_NAME_PATTERN.match(name)]
+    except FileNotFoundError:
+        return []
+    return sorted(names, reverse=True)
+
+
+def init_profiling(app):
+    """Register the profiling hooks when sampling or token triggering is configured"""
+    if not profiling_enabled():
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select
+
+from .models import db, PasswordResetToken, new_id
+
+# Outstanding tokens a user may hold; requesting another deletes the oldest
+RESET_TOKENS_PER_USER = int(os.environ.get('RESET_TOKENS_PER_USER', 3))
+# Rows deleted per transaction by the sweeper, so it never holds long locks
+RESET_TOKEN_SWEEP_BATCH = int(os.environ.get('RESET_TOKEN_SWEEP_BATCH', 1000))
+RESET_TOKEN_SWEEP_INTERVAL = float(os.environ.get('RESET_TOKEN_SWEEP_INTERVAL', 3600))
+RESET_TOKEN_LIFETIME = timedelta(hours=1)
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+
+def issue_reset_token(user_id):
+    """Add a reset token for the user, deleting their oldest beyond the cap, and return its
+    id. The token itself is minted by mint_reset_token() when the email goes out. Doesn't commit."""
+    # Keep at most RESET_TOKENS_PER_USER outstanding, counting the new one
+    trim_user_tokens(user_id, RESET_TOKENS_PER_USER - 1)
+    reset_token = PasswordResetToken(
+        id=new_id(), user_id=user_id, token_hash=hash_token(secrets.token_urlsafe(48)),
+        expires_at=datetime.utcnow() + RESET_TOKEN_LIFETIME,
+    )
+    db.session.add(reset_token)
+    return reset_token.id
+
+
+def mint_reset_token(token_id):
+    """Give an outstanding reset token a new random value and return it for the email, or
+    None if the token was used, expired or deleted. Only its digest is stored, and any link
+    minted earlier for the same token stops working. Doesn't commit."""
+    reset_token = db.session.get(PasswordResetToken, token_id)
+    if reset_token is None or reset_token.used or reset_token.expires_at < datetime.utcnow():
+        return None
+    token = secrets.token_urlsafe(48)
+    reset_token.token_hash = hash_token(token)
+    return token
+
+
+def find_reset_token(token):
+    """The unused reset token row for `token` (expired or not), found with one probe of
+    the partial digest index"""
+    return PasswordResetToken.query.filter(
+        PasswordResetToken.token_hash == hash_token(token), PasswordResetToken.used.is_(False)
+    ).first()
+
+
+def _delete_ids(ids):
+    result = db.session.execute(
+        delete(PasswordResetToken).where(PasswordResetToken.id.in_(ids)),
+        execution_options={'synchronize_session': False},
+    )
+    return result.rowcount
+
+
+def trim_user_tokens(user_id, keep):
+    """Delete the user's reset tokens beyond the `keep` newest. Doesn't commit."""
+    oldest = (
+        select(PasswordResetToken.id)
+        .where(PasswordResetToken.user_id == user_id)
+        .order_by(PasswordResetToken.expires_at.desc())
+        .offset(keep)
+    )
+    return _delete_ids(oldest.scalar_subquery())
+
+
+def sweep_reset_tokens(batch_size=None, per_user=None):
+    """Delete used and expired reset tokens, then each user's oldest tokens beyond the cap,
+    committing every batch. Returns the number of rows deleted for each reason."""
+    batch_size = batch_size or RESET_TOKEN_SWEEP_BATCH
+    per_user = RESET_TOKENS_PER_USER if per_user is None else per_user
+    reclaimed = {"expired": 0, "used": 0, "overCap": 0}
+
+    for reason, condition in (
+        ("expired", PasswordResetToken.expires_at < datetime.utcnow()),
+        ("used", PasswordResetToken.used.is_(True)),
+    ):
+        while True:
+            batch = select(PasswordResetToken.id).where(condition).limit(batch_size)
+            deleted = _delete_ids(batch.scalar_subquery())
+            db.session.commit()
+            reclaimed[reason] += deleted
+            if deleted < batch_size:
+                break
+
+    # Users who piled up tokens before the cap applied at request time
+    while True:
+        users = db.session.execute(
+            select(PasswordResetToken.user_id)
+            .group_by(PasswordResetToken.user_id)
+            .having(func.count() > per_user)
+            .limit(batch_size)
+        ).scalars().all()
+        for user_id in users:
+            reclaimed["overCap"] += trim_user_tokens(user_id, per_user)
+        db.session.commit()
+        if len(users) < batch_size:
+            break
+    return reclaimed
@@ -0,0 +1,102 @@
+import re
+from sqlalchemy import event, func, literal_column, text
+from sqlalchemy.sql import column, table
+
+from .models import db, Task
+
+# Postgres: an expression GIN index over the task text. Queries must repeat this exact
+# expression (with the config as a literal) for the planner to use the index.
+TSVECTOR = func.to_tsvector(literal_column("'english'"), Task.task)
+
+# SQLite: an external-content FTS5 table over task.task keyed by the task rowid, kept in
+# sync by triggers so every write path (ORM, bulk insert, raw SQL) updates it
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(task, content='task', content_rowid='rowid')",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, task) VALUES (new.rowid, new.task);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, task) VALUES ('delete', old.rowid, old.task);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF task ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, task) VALUES ('delete', old.rowid, old.task);
+        INSERT INTO task_fts(rowid, task) VALUES (new.rowid, new.task);
+    END""",
+    # Index any rows that already exist
+    "INSERT INTO task_fts(task_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS task_fts_insert",
+    "DROP TRIGGER IF EXISTS task_fts_delete",
+    "DROP TRIGGER IF EXISTS task_fts_update",
+    "DROP TABLE IF EXISTS task_fts",
+]
+POSTGRES_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_task_search ON task USING gin (to_tsvector('english', task))",
+]
+POSTGRES_DROP_DDL = ["DROP INDEX IF EXISTS ix_task_search"]
+
+
+def is_search_object(name):
+    """True for the tables and indexes managed here rather than by the models"""
+    return name == 'ix_task_search' or name.startswith('task_fts')
+
+
+def create_search_index(connection):
+    """Create the text index for the connection's dialect. Safe to run again, e.g. after
+    a migration rebuilds the task table."""
+    statements = {'sqlite': SQLITE_SEARCH_DDL, 'postgresql': POSTGRES_SEARCH_DDL}
+    for statement in statements.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+
+
+def drop_search_index(connection):
+    statements = {'sqlite': SQLITE_DROP_DDL, 'postgresql': POSTGRES_DROP_DDL}
+    for statement in statements.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+
+
+# db.create_all() / drop_all() manage the index along with the task table
+event.listen(Task.__table__, 'after_create', lambda target, connection, **kw: create_search_index(connection))
+event.listen(Task.__table__, 'before_drop', lambda target, connection, **kw: drop_search_index(connection))
+
+
+def search_terms(q):
+    """Split a search string into words, dropping the operators of either query syntax"""
+    return re.findall(r'\w+', q or '')
+
+
+def search_tasks(user_id, q, limit):
+    """Return the user's live tasks matching every word of `q` (each as a prefix), best first.
+
+    Raises ValueError if `q` has no searchable words.
+    """
+    terms = search_terms(q)
+    if not terms:
+        raise ValueError("Search query cannot be empty")
+
+    query = db.session.query(*Task.api_columns()).filter(Task.user_id == user_id, Task.deleted_at.is_(None))
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        fts = table('task_fts', column('rowid'))
+        match = ' '.join(f'"{term}"*' for term in terms)
+        query = (
+            query.join(fts, fts.c.rowid == literal_column('task.rowid'))
+            .filter(literal_column('task_fts').op('MATCH')(match))
+            # bm25() is lower for better matches
+            .order_by(func.bm25(literal_column('task_fts')), Task.created_at)
+        )
+    elif dialect == 'postgresql':
+        tsquery = func.to_tsquery(literal_column("'english'"), ' & '.join(f'{term}:*' for term in terms))
+        query = (
+            query.filter(TSVECTOR.op('@@')(tsquery))
+            .order_by(func.ts_rank(TSVECTOR, tsquery).desc(), Task.created_at)
+        )
+    else:
+        # No text index on other databases; fall back to substring matching
+        for term in terms:
+            query = query.filter(Task.task.ilike(f'%{term}%'))
+        query = query.order_by(Task.created_at)
+
+    return query.limit(limit).all()
@@ -0,0 +1,51 @@
+import os
+import secrets
+
+from .cache import create_cache
+from .metrics import CACHE_LOOKUPS
+
+# Seconds a cached GET /tasks response is kept. Entries are checked against the current ETag
+# before use, so this only bounds memory held for idle users. 0 disables the cache.
+TASK_CACHE_TTL = float(os.environ.get('TASK_CACHE_TTL', 30))
+# Pages kept per process (each up to TASKS_MAX_PAGE_SIZE tasks of JSON)
+TASK_CACHE_SIZE = int(os.environ.get('TASK_CACHE_SIZE', 1000))
+
+# Responses are keyed by the user's current generation, so a write invalidates every cached
+# page and filter of that user by replacing one key instead of finding them all
+task_generations = create_cache('task-generation:', maxsize=TASK_CACHE_SIZE, ttl=TASK_CACHE_TTL)
+task_cache = create_cache('tasks:', maxsize=TASK_CACHE_SIZE, ttl=TASK_CACHE_TTL)
+
+
+def get_cached_tasks(user_id, shape, etag):
+    """Return (generation, cached entry or None) for the user's GET /tasks with query `shape`.
+
+    An entry built for a different `etag` is stale (a write through another worker with its
+    own cache) and counts as a miss. Pass the generation back to cache_tasks(); it is read
+    before the rows, so a write committed while the response is built leaves that response
+    under a dead generation.
+    """
+    if TASK_CACHE_TTL <= 0:
+        return None, None
+    generation = task_generations.get(user_id)
+    if generation is None:
+        generation = secrets.token_hex(8)
+        task_generations.set(user_id, generation)
+        entry = None
+    else:
+        entry = task_cache.get(f"{user_id}:{generation}:{shape}")
+        if entry is not None and entry["etag"] != etag:
+            entry = None
+    CACHE_LOOKUPS.labels('tasks', 'miss' if entry is None else 'hit').inc()
+    return generation, entry
+
+
+def cache_tasks(user_id, generation, shape, entry):
+    """Store a JSON-serializable GET /tasks entry under the generation from get_cached_tasks()"""
+    if generation is not None:
+        task_cache.set(f"{user_id}:{generation}:{shape}", entry)
+
+
+def invalidate_tasks(user_id):
+    """Drop every cached GET /tasks response of the user. Call after committing a task write."""
+    if TASK_CACHE_TTL > 0:
+        task_generations.delete(user_id)
@@ -0,0 +1,124 @@
+import io
+from datetime import datetime
+
+PRIORITIES = ["low", "medium", "high"]
+
+
+def parse_due_date(value):
+    """Parse an ISO 8601 due date (a trailing 'Z' is accepted). Empty values mean no due date."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise ValueError("Invalid date format")
+
+
+def parse_new_task(data):
+    """Validate the body of a task creation request.
+
+    Returns a dict of Task column values. Raises ValueError with a client-facing message.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Invalid JSON")
+
+    task_text = data.get("task", "")
+    if not isinstance(task_text, str):
+        raise ValueError("Invalid JSON")
+    task_text = task_text.strip()
+    priority = data.get("priority", "medium")
+    status = data.get("status", "To Do")
+
+    if priority not in PRIORITIES:
+        raise ValueError("Invalid priority level")
+
+    if not isinstance(status, str):
+        raise ValueError("Invalid status")
+
+    if not task_text:
+        raise ValueError("Task cannot be empty")
+
+    return {
+        "task": task_text,
+        "priority": priority,
+        "status": status,
+        "due_date": parse_due_date(data.get("dueDate")),
+    }
+
+
+def parse_task_update(data):
+    """Validate the body of a task update request.
+
+    Returns a dict of only the Task column values to change. Raises ValueError with a
+    client-facing message.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Invalid JSON")
+
+    changes = {}
+    if "task" in data:
+        if not isinstance(data["task"], str):
+            raise ValueError("Invalid JSON")
+        changes["task"] = data["task"].strip()
+    if "priority" in data:
+        changes["priority"] = data["priority"]
+    if "completed" in data:
+        if not isinstance(data["completed"], bool):
+            raise ValueError("Invalid completed value")
+        changes["completed"] = data["completed"]
+    if "status" in data:
+        changes["status"] = data["status"]
+    if "dueDate" in data:
+        changes["due_date"] = parse_due_date(data["dueDate"])
+
+    if "priority" in changes and changes["priority"] not in PRIORITIES:
+        raise ValueError("Invalid priority level")
+
+    if "status" in changes and not isinstance(changes["status"], str):
+        raise ValueError("Invalid status")
+
+    if "task" in changes and not changes["task"]:
+        raise ValueError("Task cannot be empty")
+
+    return changes
+
+
+def parse_imported_task(data):
+    """Validate one imported record: the task creation rules plus an optional `completed` flag.
+
+    CSV values arrive as strings, so 'true'/'false' (and 1/0) are accepted for `completed`.
+    """
+    fields = parse_new_task(data)
+    completed = data.get("completed", False)
+    if isinstance(completed, str):
+        value = completed.strip().lower()
+        if value in ("true", "1"):
+            completed = True
+        elif value in ("false", "0", ""):
+            completed = False
+        else:
+            raise ValueError("Invalid completed value")
+    elif not isinstance(completed, bool):
+        raise ValueError("Invalid completed value")
+    fields["completed"] = completed
+    return fields
+
+
+class _RawInput(io.RawIOBase):
+    """Adapts a WSGI input stream, which may only offer read(), to the io module"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def text_reader(stream):
+    """Decode a request body as UTF-8 text, reading it incrementally (newlines untranslated, for csv)"""
+    return io.TextIOWrapper(io.BufferedReader(_RawInput(stream)), encoding='utf-8', newline='')
@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import sys
+import pytest
+from sqlalchemy import event
+
+# Added the project root to the module search path so app.py is importable
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))) 
+
+# Module settings are read from the environment at import time; POSTGRES_URI keeps any
+# app built without an explicit database away from tasks.db
+os.environ.setdefault('JWT_SECRET_KEY', 'test-secret-key')
+os.environ.setdefault('POSTGRES_URI', 'sqlite:///:memory:')
+# Minimum bcrypt cost keeps the suite fast
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+# Tests drive the email outbox explicitly instead of from a background thread
+os.environ.setdefault('EMAIL_WORKER', 'off')
+# Enables token-triggered profiling so its hooks are exercised
+os.environ.setdefault('PROFILE_SECRET', 'test-profile-secret')
+
+from backend.app import create_app, db, limiter
+from backend.auth import user_cache
+from backend.task_cache import task_cache, task_generations
+
+@pytest.fixture(scope="session")
+def app():
+    """One app for the suite; `client` gives each test its own in-memory database"""
+    return create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+
+@pytest.fixture(scope="session")
+def schema_template(app):
+    """An empty database with the full schema, copied for each test instead of running DDL"""
+    template = sqlite3.connect(":memory:")
+    with app.app_context():
+        db.create_all()
+        with db.engine.connect() as conn:
+            conn.connection.driver_connection.backup(template)
+        db.engine.dispose()
+    yield template
+    template.close()
+
+@pytest.fixture
+def client(app, schema_template):
+    limiter.enabled = False
+    user_cache.clear()
+    task_cache.clear()
+    task_generations.clear()
+    with app.app_context():
+        # The in-memory engine keeps a single connection; a new one is a new, empty database
+        with db.engine.connect() as conn:
+            schema_template.backup(conn.connection.driver_connection)
+        with app.test_client() as client:
+            yield client
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def auth_headers(client):
+    """Create a test user and return authentication headers"""
+    # Register a test user
+    response = client.post("/auth/register", json={
+        "username": "testuser",
+        "email": "test@example.com",
+        "password": "TestPass123!"
+    })
+    assert response.status_code == 201
+    data = response.get_json()
+    token = data["access_token"]
+    
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def query_counter(client):
+    """Count SQL statements sent to the database while the test runs"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', record)
@@ -0,0 +1,188 @@
+import re
+import pytest
+from datetime import datetime, timedelta
+
+from backend import auth, email_utils
+from backend.cache import LocalCache, RedisCache
+from backend.email_utils import deliver_pending
+from backend.models import db, User, PasswordResetToken
+from backend.reset_tokens import hash_token, sweep_reset_tokens
+from backend.task_cache import task_cache
+
+
+@pytest.fixture(params=['inline', 'thread', 'process'])
+def hash_executor(request, monkeypatch):
+    monkeypatch.setattr(auth, 'HASH_EXECUTOR', request.param)
+    auth.shutdown_hash_executor()
+    yield request.param
+    auth.shutdown_hash_executor()
+
+
+def test_hash_and_verify(hash_executor):
+    hashed = auth.hash_password("Correct-Horse-1")
+    assert auth.verify_password("Correct-Horse-1", hashed)
+    assert not auth.verify_password("Wrong-Horse-1", hashed)
+
+
+def test_hash_uses_configured_rounds(monkeypatch):
+    monkeypatch.setattr(auth, 'BCRYPT_ROUNDS', 5)
+    hashed = auth.hash_password("Correct-Horse-1")
+    assert hashed.startswith("$2b$05$")
+    assert not auth.needs_rehash(hashed)
+    monkeypatch.setattr(auth, 'BCRYPT_ROUNDS', 6)
+    assert auth.needs_rehash(hashed)
+    # A stronger hash is left alone when the setting is lowered
+    monkeypatch.setattr(auth, 'BCRYPT_ROUNDS', 4)
+    assert not auth.needs_rehash(hashed)
+
+
+def test_unknown_executor_rejected(monkeypatch):
+    monkeypatch.setattr(auth, 'HASH_EXECUTOR', 'gpu')
+    auth.shutdown_hash_executor()
+    with pytest.raises(RuntimeError):
+        auth.hash_password("Correct-Horse-1")
+
+
+def test_login_rehashes_old_cost_factor(client, monkeypatch):
+    response = client.post("/auth/register", json={
+        "username": "rehash",
+        "email": "rehash@example.com",
+        "password": "TestPass123!"
+    })
+    assert response.status_code == 201
+
+    monkeypatch.setattr(auth, 'BCRYPT_ROUNDS', 5)
+    response = client.post("/auth/login", json={"username": "rehash", "password": "TestPass123!"})
+    assert response.status_code == 200
+    assert User.query.filter_by(username="rehash").first().password_hash.startswith("$2b$05$")
+
+    # Lowering the setting afterwards doesn't rewrite the stronger hash
+    monkeypatch.setattr(auth, 'BCRYPT_ROUNDS', 4)
+    response = client.post("/auth/login", json={"username": "rehash", "password": "TestPass123!"})
+    assert response.status_code == 200
+    assert User.query.filter_by(username="rehash").first().password_hash.startswith("$2b$05$")
+
+
+def test_cached_user_saves_a_query(client, auth_headers, query_counter):
+    auth.user_cache.clear()
+    query_counter.clear()
+    client.get("/tasks", headers=auth_headers)
+    cold = len(query_counter)
+
+    # Keep the task list itself uncached so only the user lookup differs
+    task_cache.clear()
+    query_counter.clear()
+    client.get("/tasks", headers=auth_headers)
+    warm = len(query_counter)
+
+    assert warm == cold - 1
+
+
+def request_reset_token(client, email, monkeypatch):
+    """Request a reset, deliver the queued email and return the token it was sent with"""
+    sent = []
+    monkeypatch.setattr(email_utils, "send_email", lambda to, subject, body: sent.append(body))
+    client.post("/auth/request-password-reset", json={"email": email})
+    deliver_pending()
+    return re.search(r"token=(\S+)", sent[-1]).group(1)
+
+
+def test_profile_cache_invalidated_on_password_reset(client, auth_headers, monkeypatch):
+    assert client.get("/auth/profile", headers=auth_headers).get_json()["username"] == "testuser"
+    user = User.query.filter_by(username="testuser").first()
+    assert auth.user_cache.get(user.id) is not None
+
+    token = request_reset_token(client, "test@example.com", monkeypatch)
+    response = client.post("/auth/reset-password", json={"token": token, "password": "NewPass456!xyz"})
+    assert response.status_code == 200
+    assert auth.user_cache.get(user.id) is None
+
+
+def test_reset_token_stored_only_as_digest(client, auth_headers, monkeypatch):
+    token = request_reset_token(client, "test@example.com", monkeypatch)
+    stored = PasswordResetToken.query.one()
+    assert stored.token_hash == hash_token(token) and len(stored.token_hash) == 32
+    assert token.encode() not in stored.token_hash
+
+    response = client.post("/auth/reset-password", json={"token": token, "password": "NewPass456!xyz"})
+    assert response.status_code == 200
+    # Single use
+    response = client.post("/auth/reset-password", json={"token": token, "password": "NewPass789!xyz"})
+    assert response.status_code == 400
+
+
+def test_outstanding_reset_tokens_capped_per_user(client, auth_headers):
+    for _ in range(5):
+        client.post("/auth/request-password-reset", json={"email": "test@example.com"})
+    assert PasswordResetToken.query.count() == 3
+
+
+def add_reset_token(user_id, expires_in, used=False):
+    db.session.add(PasswordResetToken(
+        user_id=user_id, token_hash=hash_token(f"token-{PasswordResetToken.query.count()}"),
+        expires_at=datetime.utcnow() + expires_in, used=used,
+    ))
+    db.session.commit()
+
+
+def test_sweep_deletes_expired_used_and_over_cap_tokens(client, auth_headers):
+    user = User.query.filter_by(username="testuser").first()
+    for _ in range(3):
+        add_reset_token(user.id, timedelta(hours=-1))
+    add_reset_token(user.id, timedelta(hours=1), used=True)
+    for minutes in range(5):
+        add_reset_token(user.id, timedelta(minutes=minutes + 1))
+
+    assert sweep_reset_tokens(batch_size=2, per_user=3) == {"expired": 3, "used": 1, "overCap": 2}
+    remaining = PasswordResetToken.query.order_by(PasswordResetToken.expires_at).all()
+    # The newest three are kept
+    assert [t.token_hash for t in remaining] == [hash_token(f"token-{n}") for n in (6, 7, 8)]
+    assert sweep_reset_tokens() == {"expired": 0, "used": 0, "overCap": 0}
+
+
+def test_sweep_command_reports_reclaimed_rows(app, client, auth_headers):
+    user = User.query.filter_by(username="testuser").first()
+    add_reset_token(user.id, timedelta(hours=-1))
+    result = app.test_cli_runner().invoke(args=["sweep-reset-tokens"])
+    assert result.exit_code == 0
+    assert "Deleted 1 reset token(s): 1 expired, 0 used, 0 over the per-user cap" in result.output
+    assert PasswordResetToken.query.count() == 0
+
+
+def test_local_cache_lru_and_ttl():
+    cache = LocalCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    # "b" was least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d") is None
+    assert cache.stats()["hits"] == 3
+
+
+def test_redis_cache_shared_between_instances():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    first = RedisCache(None, "user:", client=fakeredis.FakeRedis(server=server))
+    second = RedisCache(None, "user:", client=fakeredis.FakeRedis(server=server))
+
+    first.set("u1", {"id": "u1"})
+    assert second.get("u1") == {"id": "u1"}
+    second.delete("u1")
+    assert first.get("u1") is None
+
+
+def test_redis_cache_with_zero_ttl_stores_nothing(client, auth_headers, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = RedisCache(None, "user:", ttl=0, client=fakeredis.FakeRedis())
+    cache.set("u1", {"id": "u1"})
+    assert cache.get("u1") is None
+
+    # USER_CACHE_TTL=0 with CACHE_REDIS_URL set: requests still work, uncached
+    monkeypatch.setattr(auth, "user_cache", cache)
+    assert client.get("/auth/profile", headers=auth_headers).status_code == 200
+    assert client.get("/tasks", headers=auth_headers).status_code == 200
@@ -0,0 +1,127 @@
+import re
+import socket
+import pytest
+from datetime import datetime, timedelta
+from email import message_from_bytes, policy
+
+from backend import email_utils
+from backend.email_utils import deliver_pending, enqueue_email
+from backend.models import db, OutboxEmail, PasswordResetToken
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return '250 OK'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = RecordingHandler()
+    port = free_port()
+    controller = aiosmtpd_controller.Controller(handler, hostname='127.0.0.1', port=port)
+    controller.start()
+    monkeypatch.setattr(email_utils, 'SMTP_HOST', '127.0.0.1')
+    monkeypatch.setattr(email_utils, 'SMTP_PORT', port)
+    monkeypatch.setattr(email_utils, 'SMTP_STARTTLS', False)
+    monkeypatch.setattr(email_utils, 'SMTP_FROM', 'noreply@example.com')
+    yield handler
+    email_utils.close_connection()
+    controller.stop()
+
+
+@pytest.fixture
+def unreachable_smtp(monkeypatch):
+    monkeypatch.setattr(email_utils, 'SMTP_HOST', '127.0.0.1')
+    monkeypatch.setattr(email_utils, 'SMTP_PORT', free_port())
+    monkeypatch.setattr(email_utils, 'SMTP_TIMEOUT', 1)
+    yield
+    email_utils.close_connection()
+
+
+def test_password_reset_enqueues_email(client, auth_headers):
+    response = client.post("/auth/request-password-reset", json={"email": "test@example.com"})
+    assert response.status_code == 200
+
+    queued = OutboxEmail.query.all()
+    assert len(queued) == 1
+    assert queued[0].recipient == "test@example.com"
+    # The outbox holds a reference to the token row, never a usable token
+    assert "/reset-password?token={reset_token}" in queued[0].body
+    assert queued[0].reset_token_id == PasswordResetToken.query.one().id
+
+
+def test_reset_token_minted_when_sent(client, auth_headers, smtp_server):
+    client.post("/auth/request-password-reset", json={"email": "test@example.com"})
+    assert deliver_pending() == (1, 0)
+
+    body = message_from_bytes(smtp_server.messages[0].content, policy=policy.default).get_content()
+    token = re.search(r"token=(\S+)", body).group(1)
+    response = client.post("/auth/reset-password", json={"token": token, "password": "NewPass456!xyz"})
+    assert response.status_code == 200
+
+
+def test_reset_email_for_used_token_is_dropped(client, auth_headers, smtp_server):
+    client.post("/auth/request-password-reset", json={"email": "test@example.com"})
+    PasswordResetToken.query.update({PasswordResetToken.used: True})
+    db.session.commit()
+
+    assert deliver_pending() == (0, 0)
+    assert smtp_server.messages == []
+    assert OutboxEmail.query.count() == 0
+
+
+def test_deliver_pending_reuses_connection(client, smtp_server):
+    for i in range(3):
+        enqueue_email(f"user{i}@example.com", "Hello", f"Message {i}")
+    db.session.commit()
+
+    assert deliver_pending() == (3, 0)
+    assert sorted(m.rcpt_tos[0] for m in smtp_server.messages) == [f"user{i}@example.com" for i in range(3)]
+    assert len(smtp_server.sessions) == 1
+    # Delivered mail is removed from the outbox
+    assert OutboxEmail.query.count() == 0
+
+
+def test_delivery_failure_backs_off(client, unreachable_smtp):
+    enqueue_email("user@example.com", "Hello", "Body")
+    db.session.commit()
+
+    assert deliver_pending() == (0, 1)
+    email = OutboxEmail.query.one()
+    assert email.status == 'pending'
+    assert email.attempts == 1
+    assert email.last_error
+    assert email.next_attempt_at > datetime.utcnow() + timedelta(seconds=email_utils.EMAIL_RETRY_BASE - 5)
+
+    # Not due yet, so nothing is attempted
+    assert deliver_pending() == (0, 0)
+
+
+def test_delivery_gives_up_after_max_attempts(client, unreachable_smtp, monkeypatch):
+    monkeypatch.setattr(email_utils, 'EMAIL_MAX_ATTEMPTS', 2)
+    enqueue_email("user@example.com", "Hello", "Body")
+    db.session.commit()
+
+    for _ in range(2):
+        OutboxEmail.query.update({OutboxEmail.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+        assert deliver_pending() == (0, 1)
+
+    email = OutboxEmail.query.one()
+    assert email.status == 'failed'
+    assert email.body == ''
+
@@ -0,0 +1,59 @@
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from backend.app import db
+from backend.db_pool import TimedQueuePool, engine_options_from_env
+
+
+def test_liveness_does_not_touch_database(client, query_counter):
+    assert client.get("/health").get_json() == {"status": "ok"}
+    assert query_counter == []
+
+
+def test_readiness_checks_database(client):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    # Public and unthrottled, so pool internals are left to /metrics
+    assert response.get_json() == {"status": "ok", "database": "ok"}
+
+
+def test_readiness_fails_when_database_is_down(client, monkeypatch):
+    def refuse():
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(db.engine, "connect", refuse)
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.get_json()["database"] == "error"
+
+
+def test_engine_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "1800")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "5000")
+    options = engine_options_from_env("postgresql://app@db/tasks")
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 0
+    assert options["pool_recycle"] == 1800
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+    # SQLite keeps its own pool; only the generic options apply
+    assert set(engine_options_from_env("sqlite:///:memory:")) == {"pool_pre_ping", "pool_recycle"}
+
+
+def test_timed_pool_reports_checkouts_and_usage():
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    engine = create_engine("sqlite://", poolclass=TimedQueuePool, pool_size=2)
+    waits = sample("db_pool_checkout_wait_seconds_count")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert sample("db_pool_connections", state="in_use") == 1
+        assert sample("db_pool_checkout_wait_seconds_count") == waits + 1
+    assert sample("db_pool_connections", state="in_use") == 0
+    assert sample("db_pool_connections", state="idle") == 1
+    engine.dispose()
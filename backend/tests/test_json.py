@@ -0,0 +1,29 @@
+import pytest
+
+from backend.json_provider import IsoJSONProvider, OrjsonProvider, orjson
+
+PROVIDERS = [IsoJSONProvider]
+if orjson is not None:
+    PROVIDERS.append(OrjsonProvider)
+
+
+@pytest.fixture(params=PROVIDERS, ids=lambda provider: provider.__name__)
+def json_provider(request, app, client):
+    original = app.json
+    app.json = request.param(app)
+    yield app.json
+    app.json = original
+
+
+def test_list_rows_match_to_dict(json_provider, client, auth_headers):
+    created = client.post("/tasks", json={"task": "Serialize me", "dueDate": "2024-06-01T12:30:00Z"}, headers=auth_headers)
+    assert created.status_code == 201
+
+    listed = client.get("/tasks", headers=auth_headers).get_json()
+    assert listed == [created.get_json()]
+    assert listed[0]["dueDate"] == "2024-06-01T12:30:00"
+
+
+def test_invalid_json_body_rejected(json_provider, client, auth_headers):
+    response = client.post("/tasks", data="{not json", content_type="application/json", headers=auth_headers)
+    assert response.status_code == 400
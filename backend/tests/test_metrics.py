@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from flask import g
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from backend import app as app_module
+from backend.models import db
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_request_latency_and_queries_per_route(client, auth_headers):
+    task = client.post("/tasks", json={"task": "Measured"}, headers=auth_headers).get_json()
+    before = sample("http_request_duration_seconds_count", method="PUT", route="/tasks/<task_id>")
+    queries_before = sample("http_request_db_queries_sum", route="/tasks/<task_id>")
+
+    client.put(f"/tasks/{task['id']}", json={"completed": True}, headers=auth_headers)
+
+    assert sample("http_request_duration_seconds_count", method="PUT", route="/tasks/<task_id>") == before + 1
+    assert sample("http_requests_total", method="PUT", route="/tasks/<task_id>", status="200") >= 1
+    assert sample("http_request_db_queries_sum", route="/tasks/<task_id>") > queries_before
+
+
+def test_unmatched_paths_share_a_label(client):
+    before = sample("http_requests_total", method="GET", route="unmatched", status="404")
+    client.get("/no/such/path/123")
+    client.get("/no/such/path/456")
+    assert sample("http_requests_total", method="GET", route="unmatched", status="404") == before + 2
+
+
+def test_bcrypt_time_recorded(client):
+    before = sample("password_hash_duration_seconds_count", operation="hash")
+    client.post("/auth/register", json={
+        "username": "hashed", "email": "hashed@example.com", "password": "TestPass123!"
+    })
+    assert sample("password_hash_duration_seconds_count", operation="hash") == before + 1
+
+
+def test_failed_statements_leave_no_timing_state(client):
+    before = sample("db_queries_total")
+    with client.application.test_request_context("/tasks"), db.engine.connect() as conn:
+        client.application.preprocess_request()
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+        # A start time left behind by a failed statement would bill this sleep to the next one
+        time.sleep(0.2)
+        conn.execute(text("SELECT 1"))
+        assert g.db_queries == 1
+        assert g.db_seconds < 0.1
+    assert sample("db_queries_total") == before + 1
+
+
+def test_metrics_endpoint(client, monkeypatch):
+    client.get("/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/health"}' in response.get_data(as_text=True)
+
+    monkeypatch.setattr(app_module, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+
+WORKER = """
+import sys
+sys.path.insert(0, {root!r})
+from backend.app import create_app
+client = create_app().test_client()
+for _ in range({requests}):
+    client.get('/health')
+"""
+
+SCRAPE = """
+import sys
+sys.path.insert(0, {root!r})
+from backend.app import create_app
+sys.stdout.write(create_app().test_client().get('/metrics').get_data(as_text=True))
+"""
+
+
+def test_metrics_merged_across_processes(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    # Two "workers" that exit before the scrape, like recycled gunicorn workers
+    for requests in (2, 3):
+        subprocess.run([sys.executable, "-c", WORKER.format(root=ROOT, requests=requests)], env=env, check=True)
+    output = subprocess.run(
+        [sys.executable, "-c", SCRAPE.format(root=ROOT)], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    assert 'http_requests_total{method="GET",route="/health",status="200"} 5.0' in output
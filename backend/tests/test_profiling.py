@@ -0,0 +1,83 @@
+import pytest
+from flask import Flask, g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from backend import profiling
+from backend.models import db
+
+ADMIN = {"Authorization": "Bearer test-profile-secret"}
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_THRESHOLD_MS", 0)
+    return tmp_path
+
+
+def profiled(headers):
+    return {**headers, "X-Profile-Token": profiling.create_profile_token()}
+
+
+def test_token_triggers_profile_with_sql(client, auth_headers, profile_dir):
+    client.post("/tasks", json={"task": "Slow one"}, headers=auth_headers)
+    assert profiling.list_profiles() == []
+
+    assert client.get("/tasks", headers=profiled(auth_headers)).status_code == 200
+    names = profiling.list_profiles()
+    assert len(names) == 1 and "-GET-tasks-" in names[0]
+
+    report = (profile_dir / names[0]).read_text()
+    assert report.startswith("GET /tasks? -> 200")
+    assert "SELECT task.id" in report
+    assert "function calls" in report
+
+
+def test_failed_statements_leave_no_timing_state(app, client):
+    with app.test_request_context("/tasks"), db.engine.connect() as conn:
+        g.profile_sql = []
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+        conn.execute(text("SELECT 1"))
+        assert not conn.info.get('profile_query_start')
+        assert [statement for _, statement in g.profile_sql] == ["SELECT 1"]
+
+
+def test_invalid_token_and_threshold(client, auth_headers, profile_dir, monkeypatch):
+    client.get("/tasks", headers={**auth_headers, "X-Profile-Token": "forged"})
+    assert profiling.list_profiles() == []
+
+    monkeypatch.setattr(profiling, "PROFILE_THRESHOLD_MS", 60_000)
+    client.get("/tasks", headers=profiled(auth_headers))
+    assert profiling.list_profiles() == []
+
+
+def test_ring_keeps_newest(client, auth_headers, profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_MAX_FILES", 2)
+    for _ in range(4):
+        client.get("/health", headers=profiled({}))
+    assert len(profiling.list_profiles()) == 2
+
+
+def test_admin_endpoints(client, profile_dir):
+    client.get("/health", headers=profiled({}))
+    assert client.get("/admin/profiles").status_code == 401
+
+    names = client.get("/admin/profiles", headers=ADMIN).get_json()["profiles"]
+    assert len(names) == 1
+    response = client.get(f"/admin/profiles/{names[0]}", headers=ADMIN)
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).startswith("GET /health? -> 200")
+
+    assert client.get("/admin/profiles/missing.txt", headers=ADMIN).status_code == 404
+    assert client.get("/admin/profiles/..%2Fapp.py", headers=ADMIN).status_code == 404
+
+
+def test_disabled_registers_no_hooks(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_SECRET", None)
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0)
+    app = Flask(__name__)
+    profiling.init_profiling(app)
+    assert not app.before_request_funcs and not app.after_request_funcs
@@ -0,0 +1,95 @@
+import pytest
+
+from backend.app import create_app, limiter, rate_limit_key
+
+
+@pytest.fixture
+def rate_limited(client):
+    limiter.enabled = True
+    limiter.reset()
+    yield client
+    limiter.enabled = False
+    limiter.reset()
+
+
+def register(client, username):
+    response = client.post("/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "TestPass123!"
+    })
+    assert response.status_code == 201
+    data = response.get_json()
+    return data["user"]["id"], {"Authorization": f"Bearer {data['access_token']}"}
+
+
+def test_key_is_user_for_authenticated_requests(app, client):
+    user_id, headers = register(client, "keyed")
+    with app.test_request_context("/tasks", headers=headers):
+        assert rate_limit_key() == f"user:{user_id}"
+
+
+def test_key_falls_back_to_address(app):
+    with app.test_request_context("/tasks"):
+        assert rate_limit_key() == "127.0.0.1"
+    with app.test_request_context("/tasks", headers={"Authorization": "Bearer not-a-token"}):
+        assert rate_limit_key() == "127.0.0.1"
+
+
+def test_users_behind_one_address_have_separate_limits(rate_limited):
+    _, first = register(rate_limited, "first")
+    _, second = register(rate_limited, "second")
+
+    statuses = [rate_limited.get("/tasks", headers=first).status_code for _ in range(51)]
+    assert statuses[:50] == [200] * 50
+    assert statuses[50] == 429
+    assert rate_limited.get("/tasks", headers=second).status_code == 200
+
+
+def test_health_is_exempt(rate_limited):
+    for _ in range(60):
+        assert rate_limited.get("/health").status_code == 200
+
+
+def test_tokens_do_not_reset_auth_limits(rate_limited):
+    # Throwaway accounts, registered before the address's register budget matters
+    tokens = [register(rate_limited, f"throwaway{i}")[1] for i in range(6)]
+    statuses = [
+        rate_limited.post("/auth/login", json={"username": "victim", "password": f"guess{i}"},
+                          headers=headers).status_code
+        for i, headers in enumerate(tokens)
+    ]
+    assert statuses == [401] * 5 + [429]
+
+    statuses = [
+        rate_limited.post("/auth/reset-password", json={"token": "guess", "password": "NewPass123!"},
+                          headers=headers).status_code
+        for headers in tokens[:4]
+    ]
+    assert statuses[3] == 429
+
+
+def test_workers_share_counters_through_redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = pytest.importorskip("redis")
+    server = fakeredis.FakeServer()
+    # create_app() rebinds the shared limiter; put the test suite's storage back afterwards
+    for attribute in ("_storage", "_limiter"):
+        monkeypatch.setattr(limiter, attribute, getattr(limiter, attribute))
+    monkeypatch.setattr(limiter, "_storage_options", dict(limiter._storage_options))
+    monkeypatch.setattr(limiter, "enabled", True)
+
+    def worker():
+        """An app with its own storage connection, like one gunicorn worker"""
+        pool = redis.ConnectionPool(connection_class=fakeredis.FakeConnection, server=server)
+        return create_app({
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "RATELIMIT_STORAGE_URI": "redis://localhost:6379/0",
+            "RATELIMIT_STORAGE_OPTIONS": {"connection_pool": pool},
+        }).test_client()
+
+    # Malformed logins are rejected before the database but still count against the limit
+    first = worker()
+    assert [first.post("/auth/login", data="{").status_code for _ in range(3)] == [400] * 3
+    second = worker()
+    assert [second.post("/auth/login", data="{").status_code for _ in range(3)] == [400, 400, 429]
@@ -0,0 +1,193 @@
+import os
+import uuid
+import pytest
+from datetime import datetime
+from flask_migrate import upgrade, downgrade
+from sqlalchemy import func, inspect, text, tuple_
+
+from backend import app as app_module
+from backend.app import create_app, db, init_migrations
+from backend.models import Task, PasswordResetToken
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), '..', 'migrations')
+
+
+def explain(query):
+    """Return the query plan for a SQLAlchemy query as a single string"""
+    statement = query.statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+    with db.engine.connect() as conn:
+        if db.engine.dialect.name == 'postgresql':
+            # Tiny test tables always favour a seq scan, so only allow one when no index fits
+            conn.execute(text("SET enable_seqscan = off"))
+            rows = conn.execute(text(f"EXPLAIN {statement}")).fetchall()
+        else:
+            rows = conn.execute(text(f"EXPLAIN QUERY PLAN {statement}")).fetchall()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def assert_uses_index(query, index_name):
+    plan = explain(query)
+    if db.engine.dialect.name == 'postgresql':
+        assert "Seq Scan" not in plan, plan
+    else:
+        assert "SCAN" not in plan.replace("SCAN CONSTANT ROW", ""), plan
+    assert index_name in plan, plan
+
+
+USER_ID = "0192f4a8-3b1c-7d2e-9f00-0a1b2c3d4e5f"
+TASK_ID = "0192f4a8-3b1d-7a00-8b11-223344556677"
+
+# Hot queries issued by the API, kept in sync with the handlers in app.py
+HOT_QUERIES = [
+    (
+        "list tasks page",
+        lambda: Task.query.filter_by(user_id=USER_ID, deleted_at=None)
+        .order_by(Task.created_at.asc(), Task.id.asc())
+        .limit(101),
+        "ix_task_user_id_created_at",
+    ),
+    (
+        "changes since cursor",
+        lambda: Task.query.filter_by(user_id=USER_ID)
+        .filter(tuple_(Task.updated_at, Task.id) > (datetime(2024, 6, 1), TASK_ID))
+        .order_by(Task.updated_at.asc(), Task.id.asc())
+        .limit(501),
+        "ix_task_user_id_updated_at",
+    ),
+    (
+        "task list version for ETag",
+        lambda: Task.query.with_entities(Task.updated_at)
+        .filter(Task.user_id == USER_ID)
+        .order_by(Task.updated_at.desc())
+        .limit(1),
+        "ix_task_user_id_updated_at",
+    ),
+    (
+        "board view by status",
+        lambda: Task.query.filter_by(user_id=USER_ID).filter(Task.status == "Done"),
+        "ix_task_user_id_status",
+    ),
+    (
+        "calendar view by due date",
+        lambda: Task.query.filter_by(user_id=USER_ID).filter(
+            Task.due_date >= datetime(2024, 6, 1), Task.due_date < datetime(2024, 7, 1)
+        ),
+        "ix_task_user_id_due_date",
+    ),
+    (
+        "stats by status",
+        lambda: Task.query.with_entities(Task.status, func.count())
+        .filter(Task.user_id == USER_ID, Task.deleted_at.is_(None))
+        .group_by(Task.status),
+        "ix_task_user_id_status",
+    ),
+    (
+        "stats due-date histogram",
+        lambda: Task.query.with_entities(func.date(Task.due_date), func.count())
+        .filter(Task.user_id == USER_ID, Task.deleted_at.is_(None),
+                Task.due_date >= datetime(2024, 6, 1), Task.due_date < datetime(2024, 7, 1))
+        .group_by(func.date(Task.due_date)),
+        "ix_task_user_id_due_date",
+    ),
+    (
+        "reset tokens by user",
+        lambda: PasswordResetToken.query.filter_by(user_id=USER_ID),
+        "ix_password_reset_token_user_id",
+    ),
+    (
+        "reset token lookup",
+        lambda: PasswordResetToken.query.filter(
+            PasswordResetToken.token_hash == b"a" * 32, PasswordResetToken.used.is_(False)
+        ),
+        "ix_password_reset_token_token_hash",
+    ),
+    (
+        "reset token sweep",
+        lambda: PasswordResetToken.query.with_entities(PasswordResetToken.id)
+        .filter(PasswordResetToken.expires_at < datetime(2024, 6, 1))
+        .limit(1000),
+        "ix_password_reset_token_expires_at",
+    ),
+]
+
+
+@pytest.mark.parametrize("name,build_query,index_name", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_queries_use_index(client, name, build_query, index_name):
+    assert_uses_index(build_query(), index_name)
+
+
+def test_migrations_match_models():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    init_migrations(app)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        try:
+            inspector = inspect(db.engine)
+            for table in db.metadata.sorted_tables:
+                migrated = {ix['name'] for ix in inspector.get_indexes(table.name)}
+                declared = {ix.name for ix in table.indexes}
+                assert declared <= migrated, f"{table.name} is missing {declared - migrated}"
+            if db.engine.dialect.name == 'sqlite':
+                assert inspector.has_table('task_fts')
+        finally:
+            downgrade(directory=MIGRATIONS_DIR, revision='base')
+            with db.engine.begin() as conn:
+                conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+
+def test_create_app_loads_dotenv(tmp_path, monkeypatch):
+    env_file = tmp_path / '.env'
+    env_file.write_text("RATELIMIT_DEFAULT=7 per minute\n")
+    monkeypatch.setattr(app_module, 'ENV_PATH', str(env_file))
+    # Registered so monkeypatch removes what load_dotenv sets
+    monkeypatch.setenv('RATELIMIT_DEFAULT', '')
+    monkeypatch.delenv('RATELIMIT_DEFAULT')
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    assert app.config['RATELIMIT_DEFAULT'] == "7 per minute"
+
+
+def test_create_app_runs_no_ddl(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'fresh.db'}"})
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+
+
+def test_task_ids_are_binary_uuid7(client, auth_headers):
+    ids = [client.post("/tasks", json={"task": f"Task {i}"}, headers=auth_headers).get_json()["id"] for i in range(3)]
+    assert all(uuid.UUID(task_id).version == 7 for task_id in ids)
+    assert ids == sorted(ids)
+
+    with db.engine.connect() as conn:
+        stored = conn.execute(text("SELECT id, user_id FROM task")).all()
+    if db.engine.dialect.name == 'sqlite':
+        assert all(isinstance(value, bytes) and len(value) == 16 for row in stored for value in row)
+    listed = client.get("/tasks", headers=auth_headers).get_json()
+    assert [task["id"] for task in listed] == ids
+
+
+def test_uuid_key_migration_converts_rows(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'keys.db'}"})
+    init_migrations(app)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR, revision='0006')
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO user (id, username, email, password_hash) VALUES (:id, 'old', 'old@example.com', 'x')"
+            ), {"id": USER_ID})
+            conn.execute(text(
+                "INSERT INTO task (id, task, priority, completed, created_at, updated_at, user_id) "
+                "VALUES (:id, 'Migrated task', 'medium', 0, :now, :now, :user_id)"
+            ), {"id": TASK_ID, "now": datetime(2024, 6, 1), "user_id": USER_ID})
+
+        upgrade(directory=MIGRATIONS_DIR)
+        task = Task.query.filter_by(id=TASK_ID, user_id=USER_ID).one()
+        assert task.task == "Migrated task"
+        with db.engine.connect() as conn:
+            assert conn.execute(text("SELECT id FROM task")).scalar() == uuid.UUID(TASK_ID).bytes
+            assert conn.execute(text("SELECT rowid FROM task_fts WHERE task_fts MATCH 'migrated'")).all()
+
+        downgrade(directory=MIGRATIONS_DIR, revision='0006')
+        with db.engine.connect() as conn:
+            assert conn.execute(text("SELECT id, user_id FROM task")).one() == (TASK_ID, USER_ID)
+        db.session.remove()
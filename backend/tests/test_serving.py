@@ -0,0 +1,120 @@
+"""Run the app under gunicorn's gevent worker and check the extensions behave per request"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("gevent")
+requests = pytest.importorskip("requests")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+PASSWORD = "TestPass123!"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def gevent_server(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("gevent")
+    port = free_port()
+    env = dict(
+        os.environ,
+        POSTGRES_URI=f"sqlite:///{tmp / 'serving.db'}",
+        GUNICORN_WORKER_CLASS="gevent",
+        WEB_CONCURRENCY="1",
+        BCRYPT_ROUNDS="12",
+        PROMETHEUS_MULTIPROC_DIR=str(tmp / "prometheus"),
+    )
+    subprocess.run([sys.executable, "-m", "flask", "--app", "backend.app", "db", "upgrade"],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", os.path.join(ROOT, "backend", "gunicorn.conf.py"),
+         "--bind", f"127.0.0.1:{port}", "backend.wsgi:app"],
+        cwd=ROOT, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            assert process.poll() is None, "gunicorn exited"
+            try:
+                if requests.get(f"{base_url}/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            assert time.monotonic() < deadline, "gunicorn did not start"
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def register(base_url, username):
+    response = requests.post(f"{base_url}/auth/register", json={
+        "username": username, "email": f"{username}@example.com", "password": PASSWORD
+    })
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_concurrent_users_see_only_their_tasks(gevent_server):
+    users = [f"greenlet{i}" for i in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        headers = list(pool.map(lambda name: register(gevent_server, name), users))
+
+    def create_and_list(index):
+        auth = headers[index]
+        for n in range(3):
+            response = requests.post(f"{gevent_server}/tasks", json={"task": f"{users[index]} task {n}"}, headers=auth)
+            assert response.status_code == 201
+        return requests.get(f"{gevent_server}/tasks", headers=auth).json()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        listings = list(pool.map(create_and_list, range(4)))
+
+    # Interleaved requests on one worker must not share a JWT identity or DB session
+    for name, tasks in zip(users, listings):
+        assert sorted(t["task"] for t in tasks) == [f"{name} task {n}" for n in range(3)]
+
+
+def test_rate_limits_are_per_user(gevent_server):
+    first = register(gevent_server, "limited1")
+    second = register(gevent_server, "limited2")
+    session = requests.Session()
+    statuses = [session.get(f"{gevent_server}/auth/profile", headers=first).status_code for _ in range(51)]
+    assert statuses == [200] * 50 + [429]
+    assert requests.get(f"{gevent_server}/auth/profile", headers=second).status_code == 200
+
+
+def test_bcrypt_does_not_block_other_requests(gevent_server):
+    register(gevent_server, "hasher")
+
+    def login():
+        start = time.perf_counter()
+        requests.post(f"{gevent_server}/auth/login", json={"username": "hasher", "password": PASSWORD})
+        return time.perf_counter() - start
+
+    one_hash = login()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        logins = [pool.submit(login) for _ in range(4)]
+        time.sleep(one_hash / 4)
+        health = []
+        for _ in range(3):
+            start = time.perf_counter()
+            assert requests.get(f"{gevent_server}/health").status_code == 200
+            health.append(time.perf_counter() - start)
+        for future in logins:
+            future.result()
+
+    # Hashes run on native threads, so the event loop keeps serving while they're in progress
+    # instead of making the health check wait for a hash to finish
+    assert max(health) < one_hash / 2, f"one hash {one_hash:.3f}s, health check {max(health):.3f}s"
@@ -1,46 +1,23 @@
-import os
-import sys
 import pytest
 import json
+import csv
+import io
+from datetime import datetime, timedelta
 
-# Added the project root to the module search path so app.py is importable
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))) 
-
-from backend.app import app, db
-from backend.models import User, Task
-
-@pytest.fixture
-def client():
-    app.config["TESTING"] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    with app.app_context():
-        db.create_all()
-        with app.test_client() as client:
-            yield client
-        db.session.remove()
-        db.drop_all()
-
-@pytest.fixture
-def auth_headers(client):
-    """Create a test user and return authentication headers"""
-    # Register a test user
-    response = client.post("/auth/register", json={
-        "username": "testuser",
-        "email": "test@example.com",
-        "password": "testpass123"
-    })
-    assert response.status_code == 201
-    data = response.get_json()
-    token = data["access_token"]
-    
-    return {"Authorization": f"Bearer {token}"}
+from sqlalchemy import update
+
+from backend import task_cache as task_cache_module
+from backend.cache import RedisCache
+from backend.models import db, User, Task
+from backend.pagination import encode_cursor
+from backend.task_cache import task_cache
 
 # Authentication tests
 def test_register_user(client):
     response = client.post("/auth/register", json={
         "username": "newuser",
         "email": "new@example.com",
-        "password": "password123"
+        "password": "Password123!"
     })
     assert response.status_code == 201
     data = response.get_json()
@@ -53,7 +30,7 @@ def test_register_duplicate_username(client):
     response = client.post("/auth/register", json={
         "username": "testuser",
         "email": "test1@example.com",
-        "password": "password123"
+        "password": "Password123!"
     })
     assert response.status_code == 201
     
@@ -61,7 +38,7 @@ def test_register_duplicate_username(client):
     response = client.post("/auth/register", json={
         "username": "testuser",
         "email": "test2@example.com",
-        "password": "password123"
+        "password": "Password123!"
     })
     assert response.status_code == 400
     assert "Username already exists" in response.get_json()["error"]
@@ -71,14 +48,14 @@ def test_login_user(client):
     response = client.post("/auth/register", json={
         "username": "loginuser",
         "email": "login@example.com",
-        "password": "password123"
+        "password": "Password123!"
     })
     assert response.status_code == 201
     
     # Login with the user
     response = client.post("/auth/login", json={
         "username": "loginuser",
-        "password": "password123"
+        "password": "Password123!"
     })
     assert response.status_code == 200
     data = response.get_json()
@@ -109,6 +86,488 @@ def test_get_tasks(client, auth_headers):
     data = response.get_json()
     assert isinstance(data, list)
 
+def test_get_tasks_paginated(client, auth_headers):
+    for i in range(5):
+        response = client.post("/tasks", json={"task": f"Task {i}"}, headers=auth_headers)
+        assert response.status_code == 201
+
+    response = client.get("/tasks?limit=2", headers=auth_headers)
+    assert response.status_code == 200
+    first_page = response.get_json()
+    assert [t["task"] for t in first_page] == ["Task 0", "Task 1"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    seen = list(first_page)
+    while cursor:
+        response = client.get(f"/tasks?limit=2&cursor={cursor}", headers=auth_headers)
+        assert response.status_code == 200
+        seen.extend(response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+
+    assert [t["task"] for t in seen] == [f"Task {i}" for i in range(5)]
+
+def test_get_tasks_descending(client, auth_headers):
+    for i in range(3):
+        client.post("/tasks", json={"task": f"Task {i}"}, headers=auth_headers)
+
+    response = client.get("/tasks?order=desc", headers=auth_headers)
+    assert response.status_code == 200
+    assert [t["task"] for t in response.get_json()] == ["Task 2", "Task 1", "Task 0"]
+    assert "X-Next-Cursor" not in response.headers
+
+def test_get_tasks_filters(client, auth_headers):
+    client.post("/tasks", json={"task": "Low", "priority": "low", "dueDate": "2024-06-01T12:00:00Z"}, headers=auth_headers)
+    client.post("/tasks", json={"task": "High", "priority": "high", "status": "Done", "dueDate": "2024-07-01T12:00:00Z"}, headers=auth_headers)
+    response = client.post("/tasks", json={"task": "Completed"}, headers=auth_headers)
+    client.put(f"/tasks/{response.get_json()['id']}", json={"completed": True}, headers=auth_headers)
+
+    response = client.get("/tasks?priority=high", headers=auth_headers)
+    assert [t["task"] for t in response.get_json()] == ["High"]
+
+    response = client.get("/tasks?status=Done", headers=auth_headers)
+    assert [t["task"] for t in response.get_json()] == ["High"]
+
+    response = client.get("/tasks?completed=true", headers=auth_headers)
+    assert [t["task"] for t in response.get_json()] == ["Completed"]
+
+    response = client.get("/tasks?dueAfter=2024-05-01T00:00:00Z&dueBefore=2024-06-15T00:00:00Z", headers=auth_headers)
+    assert [t["task"] for t in response.get_json()] == ["Low"]
+
+def test_get_tasks_invalid_params(client, auth_headers):
+    assert client.get("/tasks?limit=0", headers=auth_headers).status_code == 400
+    assert client.get("/tasks?limit=abc", headers=auth_headers).status_code == 400
+    assert client.get("/tasks?cursor=!!!", headers=auth_headers).status_code == 400
+    not_a_uuid = encode_cursor(datetime.utcnow(), "not-a-uuid")
+    assert client.get(f"/tasks?cursor={not_a_uuid}", headers=auth_headers).status_code == 400
+    assert client.get("/tasks?priority=urgent", headers=auth_headers).status_code == 400
+    assert client.get("/tasks?completed=maybe", headers=auth_headers).status_code == 400
+    assert client.get("/tasks?dueBefore=tomorrow", headers=auth_headers).status_code == 400
+
+def test_task_changes_full_sync(client, auth_headers, monkeypatch):
+    # Cursor mechanics only; the safety window is covered below
+    monkeypatch.setattr("backend.app.CHANGES_SAFETY_WINDOW", timedelta(0))
+    client.post("/tasks", json={"task": "Kept"}, headers=auth_headers)
+    response = client.post("/tasks", json={"task": "Removed"}, headers=auth_headers)
+    client.delete(f"/tasks/{response.get_json()['id']}", headers=auth_headers)
+
+    response = client.get("/tasks/changes", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [t["task"] for t in data["updated"]] == ["Kept"]
+    assert data["deleted"] == []
+    assert data["cursor"]
+    assert data["hasMore"] == False
+
+def test_task_changes_since_cursor(client, auth_headers, monkeypatch):
+    # Cursor mechanics only; the safety window is covered below
+    monkeypatch.setattr("backend.app.CHANGES_SAFETY_WINDOW", timedelta(0))
+    kept = client.post("/tasks", json={"task": "Kept"}, headers=auth_headers).get_json()
+    edited = client.post("/tasks", json={"task": "Edited"}, headers=auth_headers).get_json()
+    removed = client.post("/tasks", json={"task": "Removed"}, headers=auth_headers).get_json()
+    cursor = client.get("/tasks/changes", headers=auth_headers).get_json()["cursor"]
+
+    # Nothing changed since the last sync
+    data = client.get(f"/tasks/changes?since={cursor}", headers=auth_headers).get_json()
+    assert data == {"updated": [], "deleted": [], "cursor": cursor, "hasMore": False}
+
+    client.put(f"/tasks/{edited['id']}", json={"completed": True}, headers=auth_headers)
+    client.delete(f"/tasks/{removed['id']}", headers=auth_headers)
+    added = client.post("/tasks", json={"task": "Added"}, headers=auth_headers).get_json()
+
+    data = client.get(f"/tasks/changes?since={cursor}", headers=auth_headers).get_json()
+    assert [t["id"] for t in data["updated"]] == [edited["id"], added["id"]]
+    assert data["updated"][0]["completed"] == True
+    assert data["deleted"] == [removed["id"]]
+    assert kept["id"] not in [t["id"] for t in data["updated"]]
+    assert data["cursor"] != cursor
+
+def test_task_changes_paginated(client, auth_headers, monkeypatch):
+    # Cursor mechanics only; the safety window is covered below
+    monkeypatch.setattr("backend.app.CHANGES_SAFETY_WINDOW", timedelta(0))
+    for i in range(3):
+        client.post("/tasks", json={"task": f"Task {i}"}, headers=auth_headers)
+
+    data = client.get("/tasks/changes?limit=2", headers=auth_headers).get_json()
+    assert len(data["updated"]) == 2
+    assert data["hasMore"] == True
+
+    data = client.get(f"/tasks/changes?limit=2&since={data['cursor']}", headers=auth_headers).get_json()
+    assert [t["task"] for t in data["updated"]] == ["Task 2"]
+    assert data["hasMore"] == False
+
+def test_task_changes_cursor_holds_back_recent_writes(client, auth_headers):
+    settled = client.post("/tasks", json={"task": "Settled"}, headers=auth_headers).get_json()
+    recent = client.post("/tasks", json={"task": "Recent"}, headers=auth_headers).get_json()
+    db.session.execute(update(Task).where(Task.id == settled["id"])
+                       .values(updated_at=datetime.utcnow() - timedelta(minutes=1)))
+    db.session.commit()
+
+    data = client.get("/tasks/changes?limit=1", headers=auth_headers).get_json()
+    assert [t["task"] for t in data["updated"]] == ["Settled"]
+    assert data["hasMore"] is True
+
+    # The recent write is sent, but the cursor stays before it so a transaction that
+    # flushed earlier and commits later is not skipped
+    data = client.get(f"/tasks/changes?since={data['cursor']}", headers=auth_headers).get_json()
+    assert [t["id"] for t in data["updated"]] == [recent["id"]]
+    assert data["hasMore"] is False
+    again = client.get(f"/tasks/changes?since={data['cursor']}", headers=auth_headers).get_json()
+    assert [t["id"] for t in again["updated"]] == [recent["id"]]
+
+def test_task_changes_full_sync_right_after_a_write(client, auth_headers):
+    task = client.post("/tasks", json={"task": "Fresh"}, headers=auth_headers).get_json()
+
+    data = client.get("/tasks/changes", headers=auth_headers).get_json()
+    assert [t["id"] for t in data["updated"]] == [task["id"]]
+    assert data["cursor"]
+    again = client.get(f"/tasks/changes?since={data['cursor']}", headers=auth_headers).get_json()
+    assert [t["id"] for t in again["updated"]] == [task["id"]]
+
+def test_task_changes_invalid_cursor(client, auth_headers):
+    response = client.get("/tasks/changes?since=!!!", headers=auth_headers)
+    assert response.status_code == 400
+    not_a_uuid = encode_cursor(datetime.utcnow(), "not-a-uuid")
+    assert client.get(f"/tasks/changes?since={not_a_uuid}", headers=auth_headers).status_code == 400
+
+def test_deleted_task_cannot_be_updated(client, auth_headers):
+    task_id = client.post("/tasks", json={"task": "Gone"}, headers=auth_headers).get_json()["id"]
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    response = client.put(f"/tasks/{task_id}", json={"task": "Back"}, headers=auth_headers)
+    assert response.status_code == 404
+    assert client.delete(f"/tasks/{task_id}", headers=auth_headers).status_code == 404
+
+def test_get_tasks_conditional(client, auth_headers, query_counter):
+    client.post("/tasks", json={"task": "Cached"}, headers=auth_headers)
+    response = client.get("/tasks", headers=auth_headers)
+    etag = response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    query_counter.clear()
+    response = client.get("/tasks", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.data == b""
+    # Only the version lookup runs; no rows are loaded
+    assert len(query_counter) == 1
+
+    # Query parameters are part of the ETag
+    response = client.get("/tasks?limit=1", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+
+def test_get_tasks_etag_changes_on_write(client, auth_headers):
+    task_id = client.post("/tasks", json={"task": "Cached"}, headers=auth_headers).get_json()["id"]
+    etag = client.get("/tasks", headers=auth_headers).headers["ETag"]
+
+    client.put(f"/tasks/{task_id}", json={"completed": True}, headers=auth_headers)
+    response = client.get("/tasks", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    response = client.get("/tasks", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+def task_names(client, auth_headers, query=""):
+    return [task["task"] for task in client.get(f"/tasks{query}", headers=auth_headers).get_json()]
+
+def test_get_tasks_cached_until_write(client, auth_headers, query_counter):
+    task_id = client.post("/tasks", json={"task": "First"}, headers=auth_headers).get_json()["id"]
+    fresh = client.get("/tasks", headers=auth_headers)
+
+    query_counter.clear()
+    cached = client.get("/tasks", headers=auth_headers)
+    # Only the version lookup that validates the entry; no rows are loaded
+    assert len(query_counter) == 1
+    assert cached.data == fresh.data
+    assert cached.headers["ETag"] == fresh.headers["ETag"]
+    assert cached.headers["Last-Modified"] == fresh.headers["Last-Modified"]
+    assert task_cache.stats()["hits"] == 1
+
+    # Every write path drops the user's cached pages
+    client.put(f"/tasks/{task_id}", json={"task": "Renamed"}, headers=auth_headers)
+    assert task_names(client, auth_headers) == ["Renamed"]
+    client.post("/tasks", json={"task": "Second"}, headers=auth_headers)
+    assert task_names(client, auth_headers) == ["Renamed", "Second"]
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    assert task_names(client, auth_headers) == ["Second"]
+    client.post("/tasks/batch", json={"operations": [{"op": "create", "data": {"task": "Third"}}]},
+                headers=auth_headers)
+    assert task_names(client, auth_headers) == ["Second", "Third"]
+    import_tasks(client, auth_headers, json.dumps({"task": "Fourth"}) + "\n")
+    assert task_names(client, auth_headers) == ["Second", "Third", "Fourth"]
+
+def test_get_tasks_cache_keys(client, auth_headers):
+    client.post("/tasks", json={"task": "Low", "priority": "low"}, headers=auth_headers)
+    client.post("/tasks", json={"task": "High", "priority": "high"}, headers=auth_headers)
+    assert task_names(client, auth_headers, "?priority=high&limit=5") == ["High"]
+    # Parameter order doesn't matter, values do
+    assert task_names(client, auth_headers, "?limit=5&priority=high") == ["High"]
+    assert task_names(client, auth_headers, "?priority=low&limit=5") == ["Low"]
+
+    page = client.get("/tasks?limit=1", headers=auth_headers)
+    assert client.get("/tasks?limit=1", headers=auth_headers).headers["X-Next-Cursor"] == page.headers["X-Next-Cursor"]
+
+    # Another user's cache is separate
+    response = client.post("/auth/register", json={
+        "username": "otheruser", "email": "other@example.com", "password": "TestPass123!"
+    })
+    other_headers = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+    assert task_names(client, other_headers, "?priority=high&limit=5") == []
+
+def test_get_tasks_cache_sees_writes_from_other_workers(client, auth_headers):
+    assert task_names(client, auth_headers) == []
+    # A write that skipped this worker's invalidation, as from another gunicorn worker
+    user = User.query.filter_by(username="testuser").first()
+    db.session.add(Task("Written elsewhere", "medium", "To Do", None, user.id))
+    db.session.commit()
+    assert task_names(client, auth_headers) == ["Written elsewhere"]
+
+def test_get_tasks_cache_shared_through_redis(client, auth_headers, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(task_cache_module, "task_generations",
+                        RedisCache(None, "task-generation:", client=fakeredis.FakeRedis(server=server)))
+    shared = RedisCache(None, "tasks:", client=fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(task_cache_module, "task_cache", shared)
+
+    task_id = client.post("/tasks", json={"task": "Shared"}, headers=auth_headers).get_json()["id"]
+    assert task_names(client, auth_headers) == ["Shared"]
+    assert task_names(client, auth_headers) == ["Shared"]
+    assert shared.stats()["hits"] == 1
+
+    client.put(f"/tasks/{task_id}", json={"task": "Updated"}, headers=auth_headers)
+    assert task_names(client, auth_headers) == ["Updated"]
+
+def test_get_profile_conditional(client, auth_headers):
+    response = client.get("/auth/profile", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get("/auth/profile", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    response = client.get("/auth/profile", headers={**auth_headers, "If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+def test_export_ndjson(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("backend.app.EXPORT_BATCH_SIZE", 2)
+    for i in range(5):
+        client.post("/tasks", json={"task": f"Task {i}", "dueDate": "2024-06-01T12:00:00Z"}, headers=auth_headers)
+    removed = client.post("/tasks", json={"task": "Removed"}, headers=auth_headers).get_json()
+    client.delete(f"/tasks/{removed['id']}", headers=auth_headers)
+
+    response = client.get("/tasks/export?format=ndjson", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    assert 'filename="tasks.ndjson"' in response.headers["Content-Disposition"]
+
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r["task"] for r in records] == [f"Task {i}" for i in range(5)]
+    assert records[0]["dueDate"] == "2024-06-01T12:00:00"
+    assert "userId" not in records[0]
+
+def test_export_csv(client, auth_headers):
+    client.post("/tasks", json={"task": "Comma, quoted", "priority": "high"}, headers=auth_headers)
+
+    response = client.get("/tasks/export?format=csv", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ["id", "task", "priority", "completed", "status", "dueDate", "createdAt", "updatedAt"]
+    assert rows[1][1:5] == ["Comma, quoted", "high", "False", "To Do"]
+    assert len(rows) == 2
+
+def test_export_invalid_format(client, auth_headers):
+    response = client.get("/tasks/export?format=xml", headers=auth_headers)
+    assert response.status_code == 400
+
+def import_tasks(client, auth_headers, body, fmt="ndjson"):
+    response = client.post(f"/tasks/import?format={fmt}", data=body, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_import_ndjson_in_chunks(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("backend.app.IMPORT_CHUNK_SIZE", 2)
+    body = "\n".join([
+        json.dumps({"task": "First", "priority": "high", "completed": True}),
+        json.dumps({"task": "Bad", "priority": "urgent"}),
+        "",
+        "{not json",
+        json.dumps({"task": "Second", "dueDate": "2024-06-01T12:00:00Z"}),
+        json.dumps({"task": "Third"}),
+    ])
+    progress = import_tasks(client, auth_headers, body)
+
+    assert progress[0] == {"processed": 2, "inserted": 1,
+                           "errors": [{"line": 2, "error": "Invalid priority level"}]}
+    assert progress[1] == {"processed": 4, "inserted": 2, "errors": [{"line": 4, "error": "Invalid JSON"}]}
+    assert progress[-1] == {"done": True, "processed": 5, "inserted": 3, "failed": 2}
+
+    tasks = client.get("/tasks", headers=auth_headers).get_json()
+    assert [t["task"] for t in tasks] == ["First", "Second", "Third"]
+    assert tasks[0]["completed"] is True and tasks[0]["priority"] == "high"
+    assert tasks[1]["dueDate"].startswith("2024-06-01T12:00:00")
+
+def test_import_chunks_visible_to_syncs_taken_mid_import(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("backend.app.IMPORT_CHUNK_SIZE", 1)
+    existing = client.post("/tasks", json={"task": "Existing"}, headers=auth_headers).get_json()
+
+    class EditingStream:
+        """Hands over one line per read, and commits an edit once the first chunk is in"""
+        def __init__(self, lines):
+            self._lines = [line.encode("utf-8") for line in lines]
+            self._reads = 0
+
+        def read(self, size=-1):
+            self._reads += 1
+            if self._reads == 2:
+                db.session.execute(update(Task).where(Task.id == existing["id"]).values(completed=True))
+                db.session.commit()
+            return self._lines.pop(0) if self._lines else b""
+
+    body = [json.dumps({"task": f"t{i}"}) + "\n" for i in range(1, 4)]
+    response = client.post("/tasks/import", headers=auth_headers, environ_overrides={
+        "wsgi.input": EditingStream(body), "wsgi.input_terminated": True,
+    })
+    assert json.loads(response.get_data(as_text=True).splitlines()[-1])["inserted"] == 3
+
+    # A client that synced right after the edit must still receive the later chunks
+    edited_at = datetime.fromisoformat(
+        [t for t in client.get("/tasks", headers=auth_headers).get_json() if t["id"] == existing["id"]][0]["updatedAt"]
+    )
+    cursor = encode_cursor(edited_at, existing["id"])
+    data = client.get(f"/tasks/changes?since={cursor}", headers=auth_headers).get_json()
+    assert [t["task"] for t in data["updated"]] == ["t2", "t3"]
+    # File order is still kept by created_at
+    assert task_names(client, auth_headers) == ["Existing", "t1", "t2", "t3"]
+
+def test_import_csv_round_trips_export(client, auth_headers):
+    client.post("/tasks", json={"task": "Comma, quoted", "priority": "low"}, headers=auth_headers)
+    client.post("/tasks", json={"task": "Dated", "dueDate": "2024-06-01T12:00:00Z"}, headers=auth_headers)
+    exported = client.get("/tasks/export?format=csv", headers=auth_headers).get_data()
+
+    progress = import_tasks(client, auth_headers, exported, fmt="csv")
+    assert progress[-1] == {"done": True, "processed": 2, "inserted": 2, "failed": 0}
+    tasks = client.get("/tasks", headers=auth_headers).get_json()
+    assert [t["task"] for t in tasks] == ["Comma, quoted", "Dated"] * 2
+
+def test_import_csv_reports_rows(client, auth_headers):
+    body = "task,priority,completed\nGood,,false\n,high,false\nOdd,low,maybe\n"
+    progress = import_tasks(client, auth_headers, body, fmt="csv")
+    assert progress[0]["errors"] == [
+        {"line": 3, "error": "Task cannot be empty"},
+        {"line": 4, "error": "Invalid completed value"},
+    ]
+    assert progress[-1]["inserted"] == 1
+    assert client.get("/tasks", headers=auth_headers).get_json()[0]["priority"] == "medium"
+
+def test_import_reads_streams_with_only_read(client, auth_headers):
+    # gunicorn's wsgi.input has read()/readline() but none of the io.IOBase methods
+    class BareStream:
+        def __init__(self, data):
+            self._data = io.BytesIO(data)
+
+        def read(self, size=-1):
+            return self._data.read(size)
+
+    body = "task,priority\nFrom gunicorn,high\n".encode("utf-8")
+    response = client.post("/tasks/import?format=csv", headers=auth_headers, environ_overrides={
+        "wsgi.input": BareStream(body), "wsgi.input_terminated": True,
+    })
+    summary = json.loads(response.get_data(as_text=True).splitlines()[-1])
+    assert summary == {"done": True, "processed": 1, "inserted": 1, "failed": 0}
+
+def test_import_invalid_format(client, auth_headers):
+    response = client.post("/tasks/import?format=xml", data="", headers=auth_headers)
+    assert response.status_code == 400
+
+def test_task_stats(client, auth_headers, query_counter):
+    client.post("/tasks", json={"task": "Overdue", "priority": "high", "dueDate": "2020-01-01T09:00:00Z"}, headers=auth_headers)
+    client.post("/tasks", json={"task": "June A", "dueDate": "2024-06-01T09:00:00Z"}, headers=auth_headers)
+    client.post("/tasks", json={"task": "June B", "dueDate": "2024-06-01T18:00:00Z"}, headers=auth_headers)
+    done = client.post("/tasks", json={"task": "Done", "status": "Done", "dueDate": "2024-06-03T09:00:00Z"}, headers=auth_headers).get_json()
+    client.put(f"/tasks/{done['id']}", json={"completed": True}, headers=auth_headers)
+    removed = client.post("/tasks", json={"task": "Removed", "dueDate": "2024-06-02T09:00:00Z"}, headers=auth_headers).get_json()
+    client.delete(f"/tasks/{removed['id']}", headers=auth_headers)
+
+    client.get("/auth/profile", headers=auth_headers)
+    query_counter.clear()
+    response = client.get("/tasks/stats?from=2024-06-01&to=2024-06-30", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(query_counter) == 4
+
+    stats = response.get_json()
+    assert stats["total"] == 4
+    assert stats["completed"] == 1
+    assert stats["open"] == 3
+    # The June tasks are past due too
+    assert stats["overdue"] == 3
+    assert stats["byStatus"] == {"To Do": 3, "Done": 1}
+    assert stats["byPriority"] == {"low": 0, "medium": 3, "high": 1}
+    assert stats["dueByDay"] == {"2024-06-01": 2, "2024-06-03": 1}
+
+def test_task_status_must_be_a_string(client, auth_headers):
+    task_id = client.post("/tasks", json={"task": "Status"}, headers=auth_headers).get_json()["id"]
+    response = client.put(f"/tasks/{task_id}", json={"status": None}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid status"
+    assert client.post("/tasks", json={"task": "Odd", "status": 3}, headers=auth_headers).status_code == 400
+
+    # A null status stored before validation doesn't break the stats
+    db.session.execute(update(Task).where(Task.id == task_id).values(status=None))
+    db.session.commit()
+    response = client.get("/tasks/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()["byStatus"] == {}
+
+def test_task_stats_invalid_window(client, auth_headers):
+    assert client.get("/tasks/stats?from=June", headers=auth_headers).status_code == 400
+    assert client.get("/tasks/stats?from=2024-06-30&to=2024-06-01", headers=auth_headers).status_code == 400
+    assert client.get("/tasks/stats?from=2024-01-01&to=2025-12-31", headers=auth_headers).status_code == 400
+    response = client.get("/tasks/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()["total"] == 0
+
+def search(client, auth_headers, q):
+    response = client.get("/tasks/search", query_string={"q": q}, headers=auth_headers)
+    assert response.status_code == 200
+    return [t["task"] for t in response.get_json()]
+
+def test_search_ranks_and_matches_prefixes(client, auth_headers):
+    for text in ["Write quarterly report", "Report: review report drafts", "Buy groceries"]:
+        client.post("/tasks", json={"task": text}, headers=auth_headers)
+
+    assert search(client, auth_headers, "report") == ["Report: review report drafts", "Write quarterly report"]
+    assert search(client, auth_headers, "groc") == ["Buy groceries"]
+    assert search(client, auth_headers, "quart rep") == ["Write quarterly report"]
+    # Query syntax characters are treated as plain separators
+    assert search(client, auth_headers, 'report" OR "buy') == []
+
+def test_search_follows_updates_and_deletes(client, auth_headers):
+    task = client.post("/tasks", json={"task": "Call plumber"}, headers=auth_headers).get_json()
+    client.put(f"/tasks/{task['id']}", json={"task": "Call electrician"}, headers=auth_headers)
+    assert search(client, auth_headers, "plumber") == []
+    assert search(client, auth_headers, "electrician") == ["Call electrician"]
+
+    client.delete(f"/tasks/{task['id']}", headers=auth_headers)
+    assert search(client, auth_headers, "electrician") == []
+
+def test_search_is_scoped_to_user(client, auth_headers):
+    client.post("/tasks", json={"task": "Secret plan"}, headers=auth_headers)
+    response = client.post("/auth/register", json={
+        "username": "other", "email": "other@example.com", "password": "TestPass123!"
+    })
+    other = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+    assert search(client, other, "secret") == []
+
+def test_search_requires_query(client, auth_headers):
+    response = client.get("/tasks/search?q=%20*", headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Search query cannot be empty"
+
 def test_add_empty_task(client, auth_headers):
     response = client.post("/tasks", json={"task": ""}, headers=auth_headers)
     assert response.status_code == 400
@@ -165,6 +624,63 @@ def test_update_task(client, auth_headers):
     assert updated_task["completed"] == True
     assert updated_task["id"] == task_id
 
+def test_update_and_delete_are_single_statements(client, auth_headers, query_counter):
+    created = client.post("/tasks", json={"task": "One statement"}, headers=auth_headers).get_json()
+
+    query_counter.clear()
+    response = client.put(f"/tasks/{created['id']}", json={"completed": True}, headers=auth_headers)
+    assert response.status_code == 200
+    updated = response.get_json()
+    assert updated["completed"] is True
+    assert updated["updatedAt"] > created["updatedAt"]
+    assert {key: value for key, value in updated.items() if key not in ("completed", "updatedAt")} == \
+        {key: value for key, value in created.items() if key not in ("completed", "updatedAt")}
+    # The user is cached, so only the UPDATE ... RETURNING reaches the database
+    assert len(query_counter) == 1, query_counter
+
+    query_counter.clear()
+    assert client.delete(f"/tasks/{created['id']}", headers=auth_headers).status_code == 200
+    assert len(query_counter) == 1, query_counter
+
+    query_counter.clear()
+    assert client.put(f"/tasks/{created['id']}", json={"task": "x"}, headers=auth_headers).status_code == 404
+    assert client.delete(f"/tasks/{created['id']}", headers=auth_headers).status_code == 404
+    assert len(query_counter) == 2, query_counter
+
+def test_invalid_update_skips_database(client, auth_headers, query_counter):
+    task_id = client.post("/tasks", json={"task": "Valid"}, headers=auth_headers).get_json()["id"]
+    query_counter.clear()
+    response = client.put(f"/tasks/{task_id}", json={"priority": "urgent"}, headers=auth_headers)
+    assert response.status_code == 400
+    assert query_counter == []
+
+def test_update_without_returning(client, auth_headers, monkeypatch):
+    task_id = client.post("/tasks", json={"task": "Fallback"}, headers=auth_headers).get_json()["id"]
+    monkeypatch.setattr(db.engine.dialect, "update_returning", False)
+    response = client.put(f"/tasks/{task_id}", json={"task": "Via the ORM"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()["task"] == "Via the ORM"
+    assert client.put("/tasks/nonexistent-id", json={"task": "x"}, headers=auth_headers).status_code == 404
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_update_with_unbindable_value_is_a_bad_request(client, auth_headers, monkeypatch, returning):
+    task_id = client.post("/tasks", json={"task": "Guarded"}, headers=auth_headers).get_json()["id"]
+    monkeypatch.setattr(db.engine.dialect, "update_returning", returning)
+    # A value that got past validation but that the Boolean column can't bind
+    monkeypatch.setattr("backend.app.parse_task_update", lambda data: {"completed": "yes"})
+    response = client.put(f"/tasks/{task_id}", json={"completed": "yes"}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid JSON"
+
+    monkeypatch.undo()
+    assert client.put(f"/tasks/{task_id}", json={"completed": True}, headers=auth_headers).status_code == 200
+
+def test_update_without_changes_keeps_timestamp(client, auth_headers):
+    created = client.post("/tasks", json={"task": "Untouched"}, headers=auth_headers).get_json()
+    response = client.put(f"/tasks/{created['id']}", json={}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json() == created
+
 def test_update_nonexistent_task(client, auth_headers):
     response = client.put("/tasks/nonexistent-id", json={"task": "Updated"}, headers=auth_headers)
     assert response.status_code == 404
@@ -240,6 +756,76 @@ def test_update_task_status_and_due_date(client, auth_headers):
     # Accept both with and without 'Z'
     assert updated_task["dueDate"].startswith("2024-07-01T09:00:00")
 
+def test_batch_operations(client, auth_headers):
+    existing = client.post("/tasks", json={"task": "Existing"}, headers=auth_headers).get_json()
+    doomed = client.post("/tasks", json={"task": "Doomed"}, headers=auth_headers).get_json()
+
+    response = client.post("/tasks/batch", json={"operations": [
+        {"op": "create", "data": {"task": "Imported", "priority": "high", "dueDate": "2024-06-01T12:00:00Z"}},
+        {"op": "update", "id": existing["id"], "data": {"status": "Done", "completed": True}},
+        {"op": "delete", "id": doomed["id"]},
+    ]}, headers=auth_headers)
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == [201, 200, 200]
+    assert results[0]["task"]["task"] == "Imported"
+    assert results[0]["task"]["priority"] == "high"
+    assert results[1]["task"]["status"] == "Done"
+    assert results[2]["id"] == doomed["id"]
+
+    tasks = client.get("/tasks", headers=auth_headers).get_json()
+    assert sorted(t["task"] for t in tasks) == ["Existing", "Imported"]
+
+def test_batch_is_atomic(client, auth_headers):
+    existing = client.post("/tasks", json={"task": "Existing"}, headers=auth_headers).get_json()
+
+    response = client.post("/tasks/batch", json={"operations": [
+        {"op": "create", "data": {"task": "New"}},
+        {"op": "update", "id": existing["id"], "data": {"task": "Renamed"}},
+        {"op": "update", "id": existing["id"], "data": {"priority": "urgent"}},
+        {"op": "delete", "id": "nonexistent-id"},
+        {"op": "archive", "id": existing["id"]},
+    ]}, headers=auth_headers)
+    assert response.status_code == 400
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == [409, 409, 400, 404, 400]
+    assert results[2]["error"] == "Invalid priority level"
+    assert results[3]["error"] == "Task not found"
+
+    tasks = client.get("/tasks", headers=auth_headers).get_json()
+    assert [t["task"] for t in tasks] == ["Existing"]
+
+def test_completed_must_be_a_boolean(client, auth_headers):
+    task_id = client.post("/tasks", json={"task": "Flag"}, headers=auth_headers).get_json()["id"]
+    for value in ("yes", None, 1):
+        response = client.put(f"/tasks/{task_id}", json={"completed": value}, headers=auth_headers)
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "Invalid completed value"
+
+        response = client.post("/tasks/batch", json={"operations": [
+            {"op": "update", "id": task_id, "data": {"completed": value}},
+        ]}, headers=auth_headers)
+        assert response.status_code == 400
+        assert response.get_json()["results"][0]["error"] == "Invalid completed value"
+
+    assert client.get("/tasks", headers=auth_headers).get_json()[0]["completed"] is False
+
+def test_batch_update_after_delete(client, auth_headers):
+    existing = client.post("/tasks", json={"task": "Existing"}, headers=auth_headers).get_json()
+
+    response = client.post("/tasks/batch", json={"operations": [
+        {"op": "delete", "id": existing["id"]},
+        {"op": "update", "id": existing["id"], "data": {"task": "Too late"}},
+    ]}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()["results"][1]["status"] == 404
+
+def test_batch_invalid_body(client, auth_headers):
+    assert client.post("/tasks/batch", json={"operations": []}, headers=auth_headers).status_code == 400
+    assert client.post("/tasks/batch", json=[{"op": "create"}], headers=auth_headers).status_code == 400
+    response = client.post("/tasks/batch", data="notjson", content_type="application/json", headers=auth_headers)
+    assert response.status_code == 400
+
 # Test unauthorized access
 def test_unauthorized_access(client):
     response = client.get("/tasks")
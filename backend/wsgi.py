@@ -1,4 +1,13 @@
-from app import app
+import os
+import sys
+
+# Importable as backend.wsgi from the repository root, or as wsgi from backend/
+# (gunicorn --chdir backend wsgi:app, and the Dockerfile)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app import create_app
+
+app = create_app()
 
 if __name__ == "__main__":
     app.run()
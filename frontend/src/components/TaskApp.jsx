@@ -10,6 +10,8 @@ const API_URL = "https://api.monstager.xyz/tasks";
 const LOCAL_TASKS_KEY = 'stm_tasks';
 const LOCAL_PENDING_KEY = 'stm_pending';
 const UNLOCKED_THEMES_KEY = 'stm_unlocked_themes';
+// The API's largest page (TASKS_MAX_PAGE_SIZE); each page counts against the per-user rate limit
+const PAGE_SIZE = 500;
 
 const priorityColors = {
     low: "bg-green-100 border-green-200",
@@ -81,11 +83,18 @@ export default function TaskApp() {
     const fetchTasks = useCallback(async () => {
         setLoading(true);
         try {
-            const res = await fetch(API_URL, {
-                headers: getAuthHeaders()
-            });
-            if (!res.ok) throw new Error("Failed to fetch tasks");
-            const data = await res.json();
+            // The API returns tasks a page at a time; follow the cursor until exhausted
+            let data = [];
+            let cursor = null;
+            do {
+                const url = `${API_URL}?limit=${PAGE_SIZE}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
+                const res = await fetch(url, {
+                    headers: getAuthHeaders()
+                });
+                if (!res.ok) throw new Error("Failed to fetch tasks");
+                data = data.concat(await res.json());
+                cursor = res.headers?.get("X-Next-Cursor");
+            } while (cursor);
             setTasks(data);
             setError("");
         } catch (err) {
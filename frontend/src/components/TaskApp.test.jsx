@@ -82,6 +82,28 @@ describe('TaskApp Component', () => {
     });
   });
 
+  test('fetches tasks in the largest pages the API allows', async () => {
+    fetch
+      .mockResolvedValueOnce({
+        ok: true,
+        headers: { get: () => 'next-page' },
+        json: async () => [{ id: '1', task: 'First page', priority: 'low', completed: false }],
+      })
+      .mockResolvedValueOnce({
+        ok: true,
+        headers: { get: () => null },
+        json: async () => [{ id: '2', task: 'Second page', priority: 'low', completed: false }],
+      });
+
+    render(<TaskApp />);
+
+    await waitFor(() => {
+      expect(screen.getByText('Second page')).toBeInTheDocument();
+    });
+    expect(fetch.mock.calls[0][0]).toMatch(/\?limit=500$/);
+    expect(fetch.mock.calls[1][0]).toMatch(/\?limit=500&cursor=next-page$/);
+  });
+
   test('handles fetch error gracefully', async () => {
     fetch.mockRejectedValueOnce(new Error('Network error'));
 
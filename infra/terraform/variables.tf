@@ -38,5 +38,5 @@ variable "ssh_allowed_cidr" {
 variable "health_check_path" {
   description = "HTTP path for ALB target group health checks"
   type        = string
-  default     = "/health"
+  default     = "/health/ready"
 }
\ No newline at end of file
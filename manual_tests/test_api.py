@@ -1,8 +1,9 @@
 # pytest: skip-file
+import os
 import requests
 import json
 
-BASE_URL = "http://15.157.62.21:5000"
+BASE_URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:5000")
 
 def test_register():
     print("Testing user registration...")